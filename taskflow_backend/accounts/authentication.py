@@ -1,15 +1,59 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from .middleware import set_request_context
 
 class TaskFlowJWTAuthentication(JWTAuthentication):
     """
     Custom JWT Authentication that sets the organization (tenant) 
     and impersonation context immediately after authentication.
+    The user, their tenant and any X-View-As-User target (with its tenant)
+    are read in one joined query.
     """
     def authenticate(self, request):
+        self.view_as_id = request.headers.get('X-View-As-User')
+        self.view_as_target = None
         result = super().authenticate(request)
         if result is not None:
             user, token = result
-            view_as_id = request.headers.get('X-View-As-User')
-            set_request_context(request, user, view_as_id)
+            set_request_context(request, user, self.view_as_id, target=self.view_as_target)
         return result
+
+    def get_user(self, validated_token):
+        """
+        simplejwt's get_user, loading the impersonation target alongside.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        field = api_settings.USER_ID_FIELD
+        lookup = [user_id]
+        try:
+            target_id = int(self.view_as_id) if self.view_as_id else None
+        except ValueError:
+            target_id = None
+        if target_id is not None:
+            lookup.append(target_id)
+
+        users = {
+            str(getattr(u, field)): u
+            for u in self.user_model.objects.select_related('tenant').filter(**{f'{field}__in': lookup})
+        }
+        user = users.get(str(user_id))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if target_id is not None:
+            self.view_as_target = users.get(str(target_id))
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
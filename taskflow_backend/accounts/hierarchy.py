@@ -0,0 +1,161 @@
+from django.db import transaction
+from django.db.models import Q
+from .models import User, UserHierarchy
+from .scope import get_visible_user_ids
+
+
+def build_closure_rows(parent_map):
+    """
+    Yields (ancestor_id, descendant_id, depth) for every user in parent_map,
+    a dict of user id -> reports_to id. Broken or cyclic chains stop at the
+    first repeated user instead of looping forever.
+    """
+    for user_id in parent_map:
+        seen = {user_id}
+        yield user_id, user_id, 0
+        depth = 0
+        parent_id = parent_map.get(user_id)
+        while parent_id is not None and parent_id not in seen:
+            depth += 1
+            seen.add(parent_id)
+            yield parent_id, user_id, depth
+            parent_id = parent_map.get(parent_id)
+
+
+def rebuild_user_hierarchy(tenant=None, batch_size=1000):
+    """
+    Recomputes the closure table from User.reports_to, for one tenant or all.
+    Returns the number of rows written.
+    """
+    users = User.objects.all()
+    if tenant is not None:
+        users = users.filter(tenant=tenant)
+    parent_map = dict(users.values_list('id', 'reports_to_id'))
+
+    with transaction.atomic():
+        UserHierarchy.objects.filter(descendant_id__in=users.values('id')).delete()
+        rows = [
+            UserHierarchy(ancestor_id=a, descendant_id=d, depth=depth)
+            for a, d, depth in build_closure_rows(parent_map)
+        ]
+        UserHierarchy.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def changed_scope_fields(user):
+    """
+    The User.SCOPE_FIELDS whose value differs from when the user was loaded.
+    Freshly constructed users and deferred fields count as unchanged.
+    """
+    loaded = getattr(user, '_loaded_scope', {})
+    return {
+        f for f in User.SCOPE_FIELDS
+        if f in loaded and f in user.__dict__ and loaded[f] != user.__dict__[f]
+    }
+
+
+def reports_to_changed(user):
+    return 'reports_to_id' in changed_scope_fields(user)
+
+
+def check_reparent(user):
+    """
+    Rejects moving a user under someone in their own reporting subtree.
+    """
+    if user.reports_to_id is None:
+        return
+    if user.reports_to_id == user.pk or UserHierarchy.objects.filter(
+        ancestor_id=user.pk, descendant_id=user.reports_to_id
+    ).exists():
+        raise ValueError("A user cannot report to themselves or one of their subordinates.")
+
+
+def attach_user(user):
+    """
+    Inserts the closure rows for a newly created user.
+    """
+    UserHierarchy.objects.create(ancestor_id=user.pk, descendant_id=user.pk, depth=0)
+    _link_subtree(user.reports_to_id, [(user.pk, 0)])
+
+
+def move_user(user):
+    """
+    Re-hangs the user's whole subtree under their current reports_to.
+    """
+    with transaction.atomic():
+        subtree = list(
+            UserHierarchy.objects.filter(ancestor_id=user.pk).values_list('descendant_id', 'depth')
+        )
+        if not subtree:
+            # The user predates the closure table; give them their self row first
+            UserHierarchy.objects.create(ancestor_id=user.pk, descendant_id=user.pk, depth=0)
+            subtree = [(user.pk, 0)]
+        _detach_subtree([d for d, _ in subtree])
+        _link_subtree(user.reports_to_id, subtree)
+
+
+def detach_user(user):
+    """
+    Cuts the user's subordinates loose from everyone above the user, mirroring
+    the SET_NULL on reports_to when the user is deleted. Rows that point at the
+    user themselves are removed by the cascade.
+    """
+    below = list(
+        UserHierarchy.objects.filter(ancestor_id=user.pk, depth__gt=0).values_list('descendant_id', flat=True)
+    )
+    if below:
+        UserHierarchy.objects.filter(
+            descendant_id__in=below,
+            ancestor_id__in=UserHierarchy.objects.filter(descendant_id=user.pk, depth__gt=0).values('ancestor_id'),
+        ).delete()
+
+
+def _detach_subtree(subtree_ids):
+    UserHierarchy.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+
+
+def _link_subtree(parent_id, subtree):
+    if parent_id is None:
+        return
+    ancestors = list(
+        UserHierarchy.objects.filter(descendant_id=parent_id).values_list('ancestor_id', 'depth')
+    )
+    UserHierarchy.objects.bulk_create([
+        UserHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+        for ancestor_id, up in ancestors
+        for descendant_id, down in subtree
+    ])
+
+
+def subordinate_ids(effective_user):
+    """
+    Subquery of user ids in effective_user's reporting subtree, self included.
+    """
+    return UserHierarchy.objects.filter(ancestor_id=effective_user.pk).values('descendant_id')
+
+
+def visible_users_q(effective_user, field='id'):
+    """
+    Q object restricting `field` (a User id or FK to User) to the users that
+    effective_user may see:
+    - Super Admin -> everyone in the tenant
+    - Admin / Manager -> themselves and everyone below them
+    - Employee -> only themselves
+    Small scopes come from the cached id set in accounts.scope and are
+    inlined; larger ones stay a subquery on the closure table.
+    """
+    if effective_user.role == 'employee':
+        return Q(**{field: effective_user.pk})
+    elif effective_user.role not in ('super_admin', 'admin', 'manager'):
+        return Q(pk__in=[])
+
+    ids = get_visible_user_ids(effective_user)
+    if ids is not None:
+        return Q(**{f'{field}__in': ids})
+    elif effective_user.role == 'super_admin':
+        return Q(**{f'{field}__in': User.objects.filter(tenant_id=effective_user.tenant_id).values('id')})
+    return Q(**{f'{field}__in': subordinate_ids(effective_user)})
+
+
+def get_allowed_users_for(effective_user):
+    return User.objects.filter(visible_users_q(effective_user))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.hierarchy import rebuild_user_hierarchy
+from accounts.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the UserHierarchy closure table from User.reports_to."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help="Only rebuild users of this tenant id.")
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant'] is not None:
+            try:
+                tenant = Tenant.objects.get(pk=options['tenant'])
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant {options['tenant']} does not exist.")
+
+        rows = rebuild_user_hierarchy(tenant=tenant)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} hierarchy rows."))
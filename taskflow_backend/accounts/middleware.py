@@ -1,79 +1,143 @@
-from django.utils.deprecation import MiddlewareMixin
-import threading
-from django.db import models
+import contextvars
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import DatabaseError, models, router, transaction
 
-# Thread-local storage to keep track of the current request's tenant
-_thread_locals = threading.local()
+# Context-local storage of the current request's tenant and effective user.
+# Unlike thread-locals, these follow the request into asyncio tasks and
+# sync_to_async threads, and never bleed into the next request a worker thread
+# serves. Executor threads start with an empty context; hand them work
+# through run_in_context(). The outbox and retention threads serve every
+# tenant and pass tenant ids explicitly instead.
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
+_effective_user = contextvars.ContextVar('effective_user', default=None)
 
 def get_current_tenant():
-    return getattr(_thread_locals, 'tenant', None)
+    return _current_tenant.get()
 
-def set_request_context(request, user, view_as_id=None):
+def set_current_tenant(tenant):
     """
-    Centralized helper to set tenant and impersonation context.
-    Safely handles both session and JWT authenticated users.
+    Sets the tenant for the rest of the current context (request, task or
+    script). Returns a token for _current_tenant.reset(); prefer
+    tenant_context() where the scope is a block.
     """
-    if not user or not user.is_authenticated:
-        _thread_locals.tenant = None
-        _thread_locals.effective_user = None
-        request.effective_user = None
-        return
+    return _current_tenant.set(tenant)
 
-    # 1. Set Tenant
-    _thread_locals.tenant = getattr(user, 'tenant', None)
-    
-    # 2. Set Impersonation
-    request.effective_user = user
-    _thread_locals.effective_user = user
+def get_effective_user():
+    return _effective_user.get()
 
-    if view_as_id:
-        from .models import User
-        try:
-            target_user = User.objects.get(id=view_as_id)
-            
-            # RBAC Validation: Requester must be in the same tenant
-            if target_user.tenant == user.tenant:
-                # Hierarchy Validation: requester role > target role
-                role_weights = {'super_admin': 4, 'admin': 3, 'manager': 2, 'employee': 1}
-                requester_weight = role_weights.get(user.role, 0)
-                target_weight = role_weights.get(target_user.role, 0)
-                
-                if requester_weight > target_weight:
-                    request.effective_user = target_user
-                    _thread_locals.effective_user = target_user
-        except (User.DoesNotExist, ValueError):
-            pass
-
-class TenantMiddleware(MiddlewareMixin):
-    """
-    Middleware that attaches the tenant to thread-local storage 
-    based on the authenticated user (Session Auth).
+@contextmanager
+def tenant_context(tenant, effective_user=None):
     """
-    def process_request(self, request):
-        if request.user.is_authenticated:
-            set_request_context(request, request.user)
+    Runs a block (a request, a background job, a test) as the given tenant
+    and restores the previous context afterwards.
+    """
+    tenant_token = _current_tenant.set(tenant)
+    user_token = _effective_user.set(effective_user)
+    try:
+        yield
+    finally:
+        _effective_user.reset(user_token)
+        _current_tenant.reset(tenant_token)
 
-    def process_response(self, request, response):
-        if hasattr(_thread_locals, 'tenant'):
-            del _thread_locals.tenant
-        return response
+def run_in_context(fn, *args, **kwargs):
+    """
+    Binds fn to a copy of the current context, so it runs as the current
+    tenant and effective user in an executor thread:
+    executor.submit(run_in_context(fn, arg)) or
+    loop.run_in_executor(None, run_in_context(fn, arg)).
+    """
+    context = contextvars.copy_context()
+    return lambda: context.run(fn, *args, **kwargs)
+
+# Impersonation is only allowed downwards: requester role > target role
+ROLE_WEIGHTS = {'super_admin': 4, 'admin': 3, 'manager': 2, 'employee': 1}
+NOT_LOADED = object()
 
-class ImpersonationMiddleware(MiddlewareMixin):
+def resolve_effective_user(user, target):
     """
-    Middleware for user impersonation via header (Session Auth fallback).
+    The user a request acts as: target when user may impersonate them
+    (same tenant, strictly higher role), otherwise user itself.
+    Compares tenant ids, so neither tenant has to be loaded.
     """
-    def process_request(self, request):
-        if request.user.is_authenticated:
-            view_as_id = request.headers.get('X-View-As-User')
-            set_request_context(request, request.user, view_as_id)
+    if target is not None and target.tenant_id == user.tenant_id:
+        if ROLE_WEIGHTS.get(user.role, 0) > ROLE_WEIGHTS.get(target.role, 0):
+            return target
+    return user
+
+def set_request_context(request, user, view_as_id=None, target=NOT_LOADED):
+    """
+    Centralized helper to set tenant and impersonation context.
+    Safely handles both session and JWT authenticated users.
+    The result is memoized on the underlying HttpRequest per (user,
+    X-View-As-User), so when the middleware and the authentication class
+    both call it, the second call only re-applies it. Callers that already
+    looked up the impersonation target pass it (or None if there is no such
+    user) as target.
+    """
+    http_request = getattr(request, '_request', request)
+    authenticated = bool(user and user.is_authenticated)
+    key = (user.pk if authenticated else None, view_as_id)
 
-    def process_response(self, request, response):
-        if hasattr(_thread_locals, 'effective_user'):
-            del _thread_locals.effective_user
-        return response
+    resolved = getattr(http_request, '_tenant_context', None)
+    if resolved is None or resolved[0] != key:
+        tenant = effective_user = None
+        if authenticated:
+            tenant = getattr(user, 'tenant', None)
+            effective_user = user
+            if view_as_id:
+                if target is NOT_LOADED:
+                    from .models import User
+                    try:
+                        target = User.objects.get(id=view_as_id)
+                    except (User.DoesNotExist, ValueError):
+                        target = None
+                effective_user = resolve_effective_user(user, target)
+        resolved = (key, tenant, effective_user)
+        http_request._tenant_context = resolved
 
-def get_effective_user():
-    return getattr(_thread_locals, 'effective_user', None)
+    _, tenant, effective_user = resolved
+    _current_tenant.set(tenant)
+    _effective_user.set(effective_user)
+    request.effective_user = effective_user
+    http_request.effective_user = effective_user
+
+class TenantMiddleware:
+    """
+    Middleware that attaches the tenant and impersonation context (the
+    X-View-As-User header) to the request based on the authenticated user
+    (Session Auth); JWT requests get theirs from TaskFlowJWTAuthentication.
+    It also scopes the whole request: whatever the middleware below, the
+    authentication classes or the view set is reset once the response is
+    returned (before a streamed body is iterated). Works sync and async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with tenant_context(None):
+            self.process_request(request)
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with tenant_context(None):
+            # Loading the session user and the impersonation target queries the
+            # database, which must not happen on the event loop; the context it
+            # sets is copied back from the thread.
+            await sync_to_async(self.process_request)(request)
+            return await self.get_response(request)
+
+    def process_request(self, request):
+        if request.user.is_authenticated:
+            set_request_context(request, request.user, request.headers.get('X-View-As-User'))
 
 class TenantAwareManager(models.Manager):
     """
@@ -90,12 +154,54 @@ class TenantAwareModel(models.Model):
     """
     Abstract base model that ensures all data is strictly tenant-isolated.
     In future, make sure all models (Tasks, Projects, etc.) inherit this.
+    Instances read from the database remember their loaded values: save()
+    then writes only the changed columns (plus auto_now ones), or nothing at
+    all when no field changed, in which case no save signals are sent either.
+    If the row was deleted meanwhile, save() inserts it again, as a plain
+    Django save() would.
     """
     tenant = models.ForeignKey('accounts.Tenant', on_delete=models.CASCADE)
     objects = TenantAwareManager()
     
     class Meta:
         abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._field_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        # Refreshed values (including lazily loaded deferred fields) are the new baseline
+        refreshed = self._field_values()
+        if fields is not None:
+            attnames = {self._meta.get_field(name).attname for name in fields}
+            refreshed = {attname: value for attname, value in refreshed.items() if attname in attnames}
+        self._loaded_values = {**getattr(self, '_loaded_values', {}), **refreshed}
+
+    def _field_values(self):
+        # Deferred fields are simply absent, so reading them costs no query
+        return {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields if f.attname in self.__dict__
+        }
+
+    def changed_fields(self):
+        """
+        Names of the fields whose value differs from when the instance was
+        loaded or last saved. Instances never loaded or saved report none.
+        A field deferred at load counts as unchanged until it is assigned;
+        then it counts as changed, since there is no loaded value to compare.
+        """
+        if not hasattr(self, '_loaded_values'):
+            return set()
+        loaded = self._loaded_values
+        return {
+            f.name for f in self._meta.concrete_fields
+            if f.attname in self.__dict__ and (f.attname not in loaded or loaded[f.attname] != self.__dict__[f.attname])
+        }
         
     def save(self, *args, **kwargs):
         # Auto-assign tenant internally on creation
@@ -105,4 +211,31 @@ class TenantAwareModel(models.Model):
                 self.tenant = tenant
             else:
                 raise ValueError("Cannot save TenantAwareModel without an active tenant context.")
-        super().save(*args, **kwargs)
+
+        tracked = (
+            self.pk is not None and hasattr(self, '_loaded_values') and not args
+            and kwargs.get('update_fields') is None and not kwargs.get('force_insert')
+        )
+        if tracked:
+            changed = self.changed_fields()
+            if not changed:
+                return
+            kwargs['update_fields'] = changed | {
+                f.name for f in self._meta.concrete_fields if getattr(f, 'auto_now', False)
+            }
+        try:
+            super().save(*args, **kwargs)
+        except DatabaseError as e:
+            # Django's own "update_fields did not affect any rows" (the exact
+            # class; driver errors are subclasses): the row was deleted since
+            # it was loaded. Fall back to what an untracked save does, which
+            # writes every field and re-inserts it.
+            if not tracked or type(e) is not DatabaseError:
+                raise
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            if transaction.get_connection(using).in_atomic_block:
+                # The UPDATE itself succeeded; only Django's error marked the transaction
+                transaction.set_rollback(False, using)
+            del kwargs['update_fields']
+            super().save(*args, **kwargs)
+        self._loaded_values = self._field_values()
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.28 on 2026-10-18 02:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_hierarchy(apps, schema_editor):
+    from accounts.hierarchy import build_closure_rows
+
+    User = apps.get_model('accounts', 'User')
+    UserHierarchy = apps.get_model('accounts', 'UserHierarchy')
+    parent_map = dict(User.objects.values_list('id', 'reports_to_id'))
+    UserHierarchy.objects.bulk_create(
+        [UserHierarchy(ancestor_id=a, descendant_id=d, depth=depth) for a, d, depth in build_closure_rows(parent_map)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_invite_email_invite_team_id_invite_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarchy_descendants', to=settings.AUTH_USER_MODEL)),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarchy_ancestors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='accounts_hier_desc_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(backfill_hierarchy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_userhierarchy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['reports_to', 'role'], name='user_reports_to_role_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_reports_to_role_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='notification_retention_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
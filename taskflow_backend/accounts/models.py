@@ -11,6 +11,9 @@ class Tenant(models.Model):
     owner = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, related_name='owned_tenants')
     plan = models.CharField(max_length=20, choices=PLAN_CHOICES, default='free')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Days read notifications are kept (notifications.retention); NOTIFICATION_RETENTION_DAYS
+    # when empty, forever when 0
+    notification_retention_days = models.PositiveIntegerField(null=True, blank=True)
 
 
 
@@ -61,6 +64,44 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    class Meta:
+        indexes = [
+            # Hierarchy walks: direct reports of a user, optionally by role
+            models.Index(fields=['reports_to', 'role'], name='user_reports_to_role_idx'),
+        ]
+
+    # Fields that decide who a user can see; snapshotted on load so the
+    # hierarchy signals only do work when one of them really changes.
+    SCOPE_FIELDS = ('reports_to_id', 'role', 'tenant_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_scope = {
+            f: instance.__dict__[f] for f in cls.SCOPE_FIELDS if f in instance.__dict__
+        }
+        return instance
+
+class UserHierarchy(models.Model):
+    """
+    Closure table over User.reports_to.
+    Holds one row per (ancestor, descendant) pair, including a depth 0 row
+    for every user, so "everyone under X" is a single indexed lookup.
+    Maintained by accounts.signals; rebuild with `manage.py rebuild_hierarchy`.
+    """
+    ancestor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hierarchy_descendants')
+    descendant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hierarchy_ancestors')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='accounts_hier_desc_depth_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
 import uuid
 
 class Invite(models.Model):
@@ -0,0 +1,80 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .models import User, UserHierarchy
+
+TOO_LARGE = 'too_large'
+
+
+def _cache():
+    return caches[settings.RBAC_SCOPE_CACHE]
+
+
+def _version_key(tenant_id):
+    return f'rbac:hierarchy-version:{tenant_id}'
+
+
+def hierarchy_version(tenant_id):
+    """
+    Current hierarchy version of a tenant. Seeded from the clock when missing
+    (first use or evicted), so it never falls back to a value that
+    stale entries were stored under.
+    """
+    cache = _cache()
+    version = cache.get(_version_key(tenant_id))
+    if version is None:
+        cache.add(_version_key(tenant_id), time.time_ns(), None)
+        version = cache.get(_version_key(tenant_id))
+    return version
+
+
+def bump_hierarchy_version(tenant_id):
+    """
+    Invalidates every cached scope in the tenant once the current
+    transaction commits, so no reader can cache a pre-commit scope under the
+    new version.
+    """
+    if tenant_id is None:
+        return
+
+    def bump():
+        cache = _cache()
+        try:
+            cache.incr(_version_key(tenant_id))
+        except ValueError:
+            cache.set(_version_key(tenant_id), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def get_visible_user_ids(effective_user):
+    """
+    Cached frozenset of the user ids effective_user can see, keyed by
+    (tenant, user, role, hierarchy version). Returns None when the scope is
+    bigger than RBAC_SCOPE_INLINE_LIMIT; callers should then filter through
+    the closure table in SQL instead of inlining ids.
+    """
+    if effective_user.role == 'employee':
+        return frozenset([effective_user.pk])
+
+    cache = _cache()
+    key = (
+        f'rbac:scope:{effective_user.tenant_id}:{effective_user.pk}:'
+        f'{effective_user.role}:{hierarchy_version(effective_user.tenant_id)}'
+    )
+    ids = cache.get(key)
+    if ids is None:
+        if effective_user.role == 'super_admin':
+            qs = User.objects.filter(tenant_id=effective_user.tenant_id).values_list('id', flat=True)
+        elif effective_user.role in ('admin', 'manager'):
+            qs = UserHierarchy.objects.filter(ancestor_id=effective_user.pk).values_list('descendant_id', flat=True)
+        else:
+            qs = User.objects.none().values_list('id', flat=True)
+
+        limit = settings.RBAC_SCOPE_INLINE_LIMIT
+        found = list(qs[:limit + 1])
+        ids = TOO_LARGE if len(found) > limit else frozenset(found)
+        cache.set(key, ids, settings.RBAC_SCOPE_TTL)
+
+    return None if ids == TOO_LARGE else ids
@@ -0,0 +1,33 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .models import User
+from . import hierarchy, scope
+
+@receiver(pre_save, sender=User)
+def user_pre_save_handler(sender, instance, **kwargs):
+    if instance.pk and hierarchy.reports_to_changed(instance):
+        hierarchy.check_reparent(instance)
+
+@receiver(post_save, sender=User)
+def user_post_save_handler(sender, instance, created, **kwargs):
+    changed = hierarchy.changed_scope_fields(instance)
+    if created:
+        hierarchy.attach_user(instance)
+    elif 'reports_to_id' in changed:
+        hierarchy.move_user(instance)
+
+    # Cached visibility scopes of the old and new tenant are now stale
+    if created or changed:
+        scope.bump_hierarchy_version(instance.tenant_id)
+        if 'tenant_id' in changed:
+            scope.bump_hierarchy_version(instance._loaded_scope['tenant_id'])
+
+    instance._loaded_scope = {f: getattr(instance, f) for f in User.SCOPE_FIELDS}
+
+@receiver(pre_delete, sender=User)
+def user_pre_delete_handler(sender, instance, **kwargs):
+    hierarchy.detach_user(instance)
+
+@receiver(post_delete, sender=User)
+def user_post_delete_handler(sender, instance, **kwargs):
+    scope.bump_hierarchy_version(instance.tenant_id)
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from projects.models import Project
+from tasks.models import Task
+from . import scope
+from .middleware import get_current_tenant, get_effective_user, run_in_context, tenant_context
+from .models import Tenant, User
+
+
+class TenantMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        with tenant_context(cls.tenant):
+            cls.manager = User.objects.create_user('manager@acme.test', tenant=cls.tenant, role='manager')
+            cls.employee = User.objects.create_user('employee@acme.test', tenant=cls.tenant, reports_to=cls.manager)
+            project = Project.objects.create(name='Web', created_by=cls.manager)
+            Task.objects.create(project=project, title='Ship it', assigned_to=cls.employee, assigned_by=cls.manager)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+        self.async_client.cookies = self.client.cookies
+        self.token = RefreshToken.for_user(self.manager).access_token
+
+    async def test_async_request_with_session_user(self):
+        # The session user and the X-View-As-User target are loaded off the event loop
+        response = await self.async_client.get('/api/v1/tasks/', headers={
+            'Authorization': f'Bearer {self.token}', 'X-View-As-User': str(self.employee.pk),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.json()], ['Ship it'])
+        self.assertIsNone(get_current_tenant())
+
+    def test_run_in_context_carries_the_tenant_into_executor_threads(self):
+        def scope():
+            return get_current_tenant(), get_effective_user()
+
+        with ThreadPoolExecutor(max_workers=1) as executor, tenant_context(self.tenant, self.employee):
+            self.assertEqual(executor.submit(scope).result(), (None, None))
+            self.assertEqual(executor.submit(run_in_context(scope)).result(), (self.tenant, self.employee))
+            # and leaves the worker thread's own context alone
+            self.assertEqual(executor.submit(scope).result(), (None, None))
+
+
+class UserListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        with tenant_context(cls.tenant):
+            cls.owner = User.objects.create_user('owner@acme.test', tenant=cls.tenant, role='super_admin')
+            cls.admin = User.objects.create_user('admin@acme.test', tenant=cls.tenant, role='admin', reports_to=cls.owner)
+            cls.manager = User.objects.create_user('manager@acme.test', tenant=cls.tenant, role='manager', reports_to=cls.admin)
+            cls.employee = User.objects.create_user('employee@acme.test', tenant=cls.tenant, reports_to=cls.manager)
+            cls.peer = User.objects.create_user('peer@acme.test', tenant=cls.tenant, reports_to=cls.owner)
+        User.objects.create_user('stranger@other.test', tenant=Tenant.objects.create(name='Other'), role='employee')
+
+    def listed(self, user, query=''):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        response = client.get(f'/api/v1/accounts/users/{query}')
+        self.assertEqual(response.status_code, 200)
+        return {row['email'] for row in response.data}
+
+    def test_scope_comes_from_the_whole_subtree(self):
+        self.assertEqual(
+            self.listed(self.owner),
+            {'owner@acme.test', 'admin@acme.test', 'manager@acme.test', 'employee@acme.test', 'peer@acme.test'},
+        )
+        self.assertEqual(self.listed(self.admin), {'manager@acme.test', 'employee@acme.test'})
+        self.assertEqual(self.listed(self.admin, '?role=employee'), {'employee@acme.test'})
+        self.assertEqual(self.listed(self.manager), {'employee@acme.test'})
+        self.assertEqual(self.listed(self.employee), {'employee@acme.test'})
+
+
+class HierarchyVersionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        cls.other = Tenant.objects.create(name='Other')
+        with tenant_context(cls.tenant):
+            cls.manager = User.objects.create_user('manager@acme.test', tenant=cls.tenant, role='manager')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_version_moves_only_on_commit(self):
+        before = scope.hierarchy_version(self.tenant.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with tenant_context(self.tenant):
+                employee = User.objects.create_user('employee@acme.test', tenant=self.tenant, reports_to=self.manager)
+            self.assertEqual(scope.hierarchy_version(self.tenant.id), before)
+        after = scope.hierarchy_version(self.tenant.id)
+        self.assertNotEqual(after, before)
+
+        other_before = scope.hierarchy_version(self.other.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.tenant = self.other
+            employee.reports_to = None
+            employee.save()
+            self.assertEqual(scope.hierarchy_version(self.tenant.id), after)
+            self.assertEqual(scope.hierarchy_version(self.other.id), other_before)
+        self.assertNotEqual(scope.hierarchy_version(self.tenant.id), after)
+        self.assertNotEqual(scope.hierarchy_version(self.other.id), other_before)
@@ -10,6 +10,7 @@ from .serializers import (
     InviteSignupSerializer,
     CustomTokenObtainPairSerializer
 )
+from .hierarchy import visible_users_q
 from .models import Invite
 from rest_framework_simplejwt.views import TokenObtainPairView
 
@@ -49,27 +50,19 @@ class UserListCreateView(generics.ListCreateAPIView):
         return UserSerializer
 
     def get_queryset(self):
-        user = self.request.user
+        user = getattr(self.request, 'effective_user', self.request.user)
         role_filter = self.request.query_params.get('role')
         
-        # Base QuerySet: enforce tenant isolation
-        queryset = User.objects.all()
+        # Tenant isolation plus the RBAC scope from the closure table, the
+        # same one tasks, projects and the dashboards use
+        queryset = User.objects.filter(tenant_id=user.tenant_id).filter(visible_users_q(user))
         
-        # Apply role hierarchy
-        if user.role == 'super_admin':
-            # Super Admin can see everyone in their tenant (handled by middleware)
-            pass
-        elif user.role == 'admin':
-            # Admin sees subordinates
-            queryset = queryset.filter(reports_to=user)
-        elif user.role == 'manager':
-            # Manager sees employees directly under them
-            queryset = queryset.filter(reports_to=user, role='employee')
-        elif user.role == 'employee':
-            # Employee only sees self
-            queryset = queryset.filter(id=user.id)
-        else:
-            return User.objects.none()
+        if user.role in ('admin', 'manager'):
+            # Admins and managers list the people below them, not themselves
+            queryset = queryset.exclude(id=user.id)
+        if user.role == 'manager':
+            # Managers only manage employees
+            queryset = queryset.filter(role='employee')
 
         # Apply additional role filtering via query param if provided
         if role_filter:
@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+from accounts.scope import hierarchy_version
+
+STATS = ('hit', 'stale', 'miss', 'wait')
+# How long one worker may hold the recompute lock, and how long others wait for it
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.05
+
+
+def _cache():
+    return caches[settings.ANALYTICS_CACHE]
+
+
+def _version_key(tenant_id):
+    return f'analytics:version:{tenant_id}'
+
+
+def analytics_version(tenant_id):
+    """
+    Data version of a tenant's analytics; part of every cache key, so a bump
+    orphans all of the tenant's entries at once. Seeded from the clock like
+    the RBAC hierarchy version.
+    """
+    cache = _cache()
+    version = cache.get(_version_key(tenant_id))
+    if version is None:
+        cache.add(_version_key(tenant_id), time.time_ns(), None)
+        version = cache.get(_version_key(tenant_id))
+    return version
+
+
+def bump_analytics_version(tenant_id):
+    """
+    Invalidates the tenant's cached analytics once the current transaction
+    commits, so no reader can cache pre-commit numbers under the new version.
+    """
+    if tenant_id is None:
+        return
+
+    def bump():
+        cache = _cache()
+        try:
+            cache.incr(_version_key(tenant_id))
+        except ValueError:
+            cache.set(_version_key(tenant_id), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def _stats_cache():
+    """
+    The cache the hit/miss counters live in (ANALYTICS_STATS_CACHE), or None
+    when stats are off. Counters in a per-process cache would only show the
+    share of whichever process reads them, so such backends are refused.
+    """
+    if settings.ANALYTICS_STATS_CACHE is None:
+        return None
+    cache = caches[settings.ANALYTICS_STATS_CACHE]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            f"ANALYTICS_STATS_CACHE ({settings.ANALYTICS_STATS_CACHE!r}) must be a cache shared by all workers."
+        )
+    return cache
+
+
+def _count(endpoint, stat):
+    cache = _stats_cache()
+    if cache is None:
+        return
+    key = f'analytics:stats:{endpoint}:{stat}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def cache_stats():
+    """
+    {endpoint: {'hit', 'stale', 'miss', 'wait', 'hit_rate'}} for every
+    endpoint that has been cached, summed over all workers, or None when
+    ANALYTICS_STATS_CACHE is unset. 'stale' responses came from an expired
+    entry while another worker refreshed it and 'wait' ones from an entry
+    another worker had just computed; both count as hits.
+    """
+    cache = _stats_cache()
+    if cache is None:
+        return None
+    endpoints = cache.get('analytics:stats:endpoints') or set()
+    stats = {}
+    for endpoint in sorted(endpoints):
+        counts = cache.get_many([f'analytics:stats:{endpoint}:{stat}' for stat in STATS])
+        row = {stat: counts.get(f'analytics:stats:{endpoint}:{stat}', 0) for stat in STATS}
+        served = row['hit'] + row['stale'] + row['miss'] + row['wait']
+        row['hit_rate'] = round((served - row['miss']) / served, 3) if served else None
+        stats[endpoint] = row
+    return stats
+
+
+def _register(endpoint):
+    cache = _stats_cache()
+    if cache is None:
+        return
+    endpoints = cache.get('analytics:stats:endpoints') or set()
+    if endpoint not in endpoints:
+        cache.set('analytics:stats:endpoints', endpoints | {endpoint}, None)
+
+
+def cached_analytics(endpoint, per_user=False):
+    """
+    Caches a view's get() payload per tenant, data version, query string and
+    day; per_user=True adds the viewer and RBAC hierarchy version for views
+    whose numbers depend on who is asking.
+    Entries are fresh for ANALYTICS_CACHE_TTL seconds and kept
+    ANALYTICS_CACHE_STALE_TTL seconds longer as stale copies. Only one worker
+    (whoever wins a cache.add lock) recomputes an expired or missing entry:
+    the rest serve the stale copy, or wait briefly for the fresh one when
+    there is none.
+    Only 200 responses are cached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            effective_user = getattr(request, 'effective_user', request.user)
+            tenant_id = effective_user.tenant_id
+            scope = 'tenant'
+            if per_user:
+                scope = f'{effective_user.pk}:{effective_user.role}:{hierarchy_version(tenant_id)}'
+            params = hashlib.sha1(request.query_params.urlencode().encode()).hexdigest()[:16]
+            key = (
+                f'analytics:{endpoint}:{tenant_id}:{analytics_version(tenant_id)}:'
+                f'{scope}:{timezone.localdate().isoformat()}:{params}'
+            )
+            lock_key = f'{key}:lock'
+            cache = _cache()
+            ttl = settings.ANALYTICS_CACHE_TTL
+
+            def compute(stat, locked=True):
+                _register(endpoint)
+                _count(endpoint, stat)
+                try:
+                    response = method(view, request, *args, **kwargs)
+                    if response.status_code == 200:
+                        cache.set(
+                            key, (time.time() + ttl, response.data),
+                            ttl + settings.ANALYTICS_CACHE_STALE_TTL,
+                        )
+                    return response
+                finally:
+                    if locked:
+                        cache.delete(lock_key)
+
+            entry = cache.get(key)
+            if entry is not None:
+                fresh_until, data = entry
+                if time.time() < fresh_until:
+                    _count(endpoint, 'hit')
+                    return Response(data)
+                if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+                    # Someone else is refreshing it; the stale copy will do meanwhile
+                    _count(endpoint, 'stale')
+                    return Response(data)
+                return compute('miss')
+
+            if cache.add(lock_key, 1, LOCK_TIMEOUT):
+                return compute('miss')
+
+            # Another worker is computing this very entry; wait for it rather than pile on
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL)
+                entry = cache.get(key)
+                if entry is not None:
+                    _count(endpoint, 'wait')
+                    return Response(entry[1])
+            return compute('miss', locked=False)
+        return wrapper
+    return decorator
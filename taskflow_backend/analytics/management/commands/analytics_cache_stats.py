@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints hit/miss counts of the analytics response cache, summed over all "
+        "workers. Needs ANALYTICS_STATS_CACHE set to a shared cache alias."
+    )
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        if stats is None:
+            raise CommandError("Analytics cache stats are off; set ANALYTICS_STATS_CACHE to a shared cache alias.")
+        if not stats:
+            self.stdout.write("No analytics cache activity recorded.")
+            return
+        for endpoint, row in stats.items():
+            rate = '-' if row['hit_rate'] is None else f"{row['hit_rate']:.1%}"
+            self.stdout.write(
+                f"{endpoint:24} hit={row['hit']} stale={row['stale']} wait={row['wait']} "
+                f"miss={row['miss']} hit_rate={rate}"
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import Tenant
+from analytics.rollup import rebuild_task_stats
+
+
+class Command(BaseCommand):
+    help = "Backfills or repairs the TaskDailyStat rollup from the task table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help="Only rebuild stats of this tenant id.")
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant'] is not None:
+            try:
+                tenant = Tenant.objects.get(pk=options['tenant'])
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant {options['tenant']} does not exist.")
+
+        rows = rebuild_task_stats(tenant=tenant)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} task stat rows."))
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.28 on 2026-10-18 02:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_task_stats(apps, schema_editor):
+    from analytics.rollup import aggregate_tasks
+
+    Task = apps.get_model('tasks', 'Task')
+    TaskDailyStat = apps.get_model('analytics', 'TaskDailyStat')
+    TaskDailyStat.objects.bulk_create(
+        [
+            TaskDailyStat(
+                tenant_id=row['tenant_id'], day=row['stat_day'], project_id=row['project_id'],
+                assignee_id=row['assigned_to_id'], status=row['status'],
+                due_date=row['stat_due_date'], task_count=row['stat_count'],
+            )
+            for row in aggregate_tasks(Task.objects.all())
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('accounts', '0005_userhierarchy'),
+        ('tasks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('task_count', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_task_stats', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='projects.project')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'day'], name='analytics_stat_tenant_day_idx'), models.Index(fields=['project', 'day', 'assignee', 'status', 'due_date'], name='analytics_stat_key_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_task_stats, migrations.RunPython.noop),
+    ]
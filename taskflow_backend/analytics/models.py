@@ -1,3 +1,28 @@
 from django.db import models
+from django.conf import settings
+from accounts.middleware import TenantAwareModel
 
-# Create your models here.
+class TaskDailyStat(TenantAwareModel):
+    """
+    Daily task rollup: how many tasks created on `day` currently sit in each
+    (project, assignee, status, due_date) slot. due_date is only kept for open
+    tasks, since it only matters for overdue checks, so finished history
+    collapses to a handful of rows per day.
+    Rows are not unique per key; readers always Sum('task_count').
+    Maintained by analytics.signals; repair with `manage.py rebuild_task_stats`.
+    """
+    day = models.DateField()
+    project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='daily_stats')
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='daily_task_stats')
+    status = models.CharField(max_length=20)
+    due_date = models.DateField(null=True, blank=True)
+    task_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'day'], name='analytics_stat_tenant_day_idx'),
+            models.Index(fields=['project', 'day', 'assignee', 'status', 'due_date'], name='analytics_stat_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.task_count}"
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, When, DateField
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from tasks.aggregates import OPEN_STATUSES
+from .models import TaskDailyStat
+
+KEY_FIELDS = ('tenant_id', 'project_id', 'assigned_to_id', 'status', 'due_date', 'created_at')
+UNKNOWN = object()
+# TaskDailyStat columns, in rollup_key() order
+SLOT_FIELDS = ('tenant_id', 'day', 'project_id', 'assignee_id', 'status', 'due_date')
+
+
+def rollup_key(task):
+    """
+    The TaskDailyStat slot a task counts towards, or UNKNOWN when some of the
+    fields were deferred and reading them would cost a query.
+    """
+    if any(field not in task.__dict__ for field in KEY_FIELDS) or task.created_at is None:
+        return UNKNOWN
+    return (
+        task.tenant_id,
+        timezone.localdate(task.created_at),
+        task.project_id,
+        task.assigned_to_id,
+        task.status,
+        None if task.status == 'done' else task.due_date,
+    )
+
+
+def task_sum(filter=None, prefix=''):
+    """
+    Sum of task_count over rollup rows, 0 rather than NULL when nothing matches.
+    prefix lets the sum run across a relation, e.g. 'daily_stats__'.
+    """
+    return Coalesce(Sum(f'{prefix}task_count', filter=filter), 0)
+
+
+def stat_sums(today):
+    """
+    Rollup counterpart of tasks.aggregates.status_counts().
+    """
+    return {
+        'total': task_sum(),
+        'todo': task_sum(Q(status='todo')),
+        'in_progress': task_sum(Q(status='in_progress')),
+        'done': task_sum(Q(status='done')),
+        'overdue': task_sum(Q(status__in=OPEN_STATUSES, due_date__lt=today)),
+    }
+
+
+def bump(key, delta):
+    """
+    Adds delta to the slot, creating the row on first use. Concurrent first
+    inserts may leave two rows for a key, which is harmless since every
+    reader sums them.
+    """
+    if key is UNKNOWN or key is None:
+        return
+    slot = dict(zip(SLOT_FIELDS, key))
+    updated = TaskDailyStat._base_manager.filter(**slot).update(task_count=F('task_count') + delta)
+    if not updated and delta > 0:
+        TaskDailyStat._base_manager.create(task_count=delta, **slot)
+
+
+def apply_deltas(deltas):
+    """
+    Applies a {key: delta} mapping. Slots that already have a row get an
+    F() increment each; new slots are inserted together with one bulk_create,
+    which is what keeps bulk imports (many fresh slots) cheap.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta and key is not None and key is not UNKNOWN}
+    if not deltas:
+        return
+    existing = set(
+        TaskDailyStat._base_manager.filter(
+            tenant_id__in={key[0] for key in deltas},
+            day__in={key[1] for key in deltas},
+            project_id__in={key[2] for key in deltas},
+        ).values_list(*SLOT_FIELDS)
+    )
+    new_rows = []
+    for key, delta in deltas.items():
+        if key in existing:
+            bump(key, delta)
+        elif delta > 0:
+            new_rows.append(TaskDailyStat(task_count=delta, **dict(zip(SLOT_FIELDS, key))))
+    TaskDailyStat._base_manager.bulk_create(new_rows)
+
+
+def aggregate_tasks(tasks):
+    """
+    Groups a Task queryset into rollup rows, as dicts of TaskDailyStat fields.
+    """
+    return tasks.annotate(
+        stat_day=TruncDate('created_at'),
+        stat_due_date=Case(
+            When(status='done', then=None),
+            default=F('due_date'),
+            output_field=DateField(),
+        ),
+    ).values('tenant_id', 'stat_day', 'project_id', 'assigned_to_id', 'status', 'stat_due_date').annotate(
+        stat_count=Count('id'),
+    ).order_by()
+
+
+def rebuild_task_stats(tenant=None, batch_size=1000):
+    """
+    Recomputes TaskDailyStat from the task table, for one tenant or all.
+    Returns the number of rows written.
+    """
+    from tasks.models import Task
+
+    tasks = Task._base_manager.all()
+    stats = TaskDailyStat._base_manager.all()
+    if tenant is not None:
+        tasks = tasks.filter(tenant=tenant)
+        stats = stats.filter(tenant=tenant)
+
+    with transaction.atomic():
+        stats.delete()
+        rows = [
+            TaskDailyStat(
+                tenant_id=row['tenant_id'], day=row['stat_day'], project_id=row['project_id'],
+                assignee_id=row['assigned_to_id'], status=row['status'],
+                due_date=row['stat_due_date'], task_count=row['stat_count'],
+            )
+            for row in aggregate_tasks(tasks).iterator()
+        ]
+        TaskDailyStat._base_manager.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,68 @@
+from collections import Counter
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import User
+from projects.models import Project, ProjectMember
+from tasks.models import Task
+from tasks.signals import tasks_bulk_saved
+from . import rollup
+from .cache import bump_analytics_version
+
+@receiver(post_init, sender=Task)
+def task_post_init_handler(sender, instance, **kwargs):
+    # Remember which rollup slot a loaded task counted towards
+    instance._rollup_key = rollup.rollup_key(instance) if instance.pk else None
+
+@receiver(pre_save, sender=Task)
+def task_pre_save_handler(sender, instance, **kwargs):
+    if instance.pk and instance._rollup_key is rollup.UNKNOWN:
+        # Partially loaded instance: read the stored slot before it is overwritten
+        stored = Task._base_manager.filter(pk=instance.pk).first()
+        instance._rollup_key = rollup.rollup_key(stored) if stored else None
+
+@receiver(post_save, sender=Task)
+def task_rollup_post_save_handler(sender, instance, created, **kwargs):
+    new_key = rollup.rollup_key(instance)
+    if new_key is rollup.UNKNOWN:
+        # Partially loaded instance: its deferred fields kept their stored values
+        stored = Task._base_manager.filter(pk=instance.pk).first()
+        new_key = rollup.rollup_key(stored) if stored else None
+    old_key = None if created else instance._rollup_key
+    if new_key != old_key:
+        rollup.bump(old_key, -1)
+        rollup.bump(new_key, 1)
+    instance._rollup_key = new_key
+
+@receiver(post_delete, sender=Task)
+def task_rollup_post_delete_handler(sender, instance, **kwargs):
+    rollup.bump(rollup.rollup_key(instance), -1)
+
+@receiver(tasks_bulk_saved, sender=Task)
+def task_rollup_bulk_saved_handler(sender, created, updated, **kwargs):
+    deltas = Counter()
+    for task in created:
+        task._rollup_key = rollup.rollup_key(task)
+        deltas[task._rollup_key] += 1
+    for task in updated:
+        new_key = rollup.rollup_key(task)
+        if new_key != task._rollup_key:
+            deltas[task._rollup_key] -= 1
+            deltas[new_key] += 1
+            task._rollup_key = new_key
+    rollup.apply_deltas(deltas)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def analytics_cache_invalidation_handler(sender, instance, **kwargs):
+    bump_analytics_version(instance.tenant_id)
+
+@receiver(tasks_bulk_saved, sender=Task)
+def analytics_cache_bulk_saved_handler(sender, created, updated, **kwargs):
+    for tenant_id in {task.tenant_id for task in [*created, *updated]}:
+        bump_analytics_version(tenant_id)
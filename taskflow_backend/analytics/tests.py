@@ -1,3 +1,42 @@
-from django.test import TestCase
+import tempfile
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.middleware import tenant_context
+from accounts.models import Tenant, User
+from .cache import cache_stats
 
-# Create your tests here.
+
+class CacheStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        with tenant_context(cls.tenant):
+            cls.admin = User.objects.create_user('admin@acme.test', tenant=cls.tenant, role='super_admin')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+
+    def test_stats_are_off_by_default(self):
+        self.assertEqual(self.client.get('/api/v1/analytics/overview').status_code, 200)
+        self.assertIsNone(cache_stats())
+
+    def test_counts_go_to_the_shared_stats_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={**caches.settings, 'stats': shared}, ANALYTICS_STATS_CACHE='stats'):
+                self.client.get('/api/v1/analytics/overview')
+                self.client.get('/api/v1/analytics/overview')
+                self.assertEqual(
+                    cache_stats(),
+                    {'overview': {'hit': 1, 'stale': 0, 'miss': 1, 'wait': 0, 'hit_rate': 0.5}},
+                )
+
+    @override_settings(ANALYTICS_STATS_CACHE='default')
+    def test_per_process_stats_cache_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache_stats()
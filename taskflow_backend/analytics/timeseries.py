@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+GRANULARITIES = ('day', 'week', 'month')
+DEFAULT_DAYS = 7
+MAX_DAYS = 731
+
+
+class RangeError(ValueError):
+    pass
+
+
+def parse_range(params, today):
+    """
+    Reads ?days=, ?start=, ?end= (ISO dates) and ?granularity= from the query
+    params. Returns (start, end, granularity) with both ends inclusive.
+    Raises RangeError with a user-facing message on bad input.
+    """
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise RangeError(f"granularity must be one of: {', '.join(GRANULARITIES)}.")
+
+    try:
+        end = date.fromisoformat(params['end']) if params.get('end') else today
+        start = date.fromisoformat(params['start']) if params.get('start') else None
+        days = int(params.get('days', DEFAULT_DAYS))
+    except ValueError:
+        raise RangeError("start/end must be YYYY-MM-DD dates and days an integer.")
+
+    if start is None:
+        if days < 1:
+            raise RangeError("days must be a positive integer.")
+        start = end - timedelta(days=days - 1)
+    if start > end:
+        raise RangeError("start must not be after end.")
+    if (end - start).days + 1 > MAX_DAYS:
+        raise RangeError(f"The range cannot span more than {MAX_DAYS} days.")
+    return start, end, granularity
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start, end, granularity):
+    """
+    Every bucket start from the one containing `start` through the one
+    containing `end`, for gap filling.
+    """
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'week':
+            current += timedelta(days=7)
+        elif granularity == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
@@ -1,10 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from accounts.middleware import get_current_tenant
-from tasks.models import Task
 from projects.models import Project
-from django.db.models import Count, Q
+from tasks.aggregates import OPEN_STATUSES
+from .models import TaskDailyStat
+from tasks.models import Task
+from taskflow_backend.conditional import conditional_get
+from .cache import cached_analytics
+from .rollup import stat_sums, task_sum
+from .timeseries import RangeError, parse_range, bucket_starts
+from django.db.models import Q, DateField
+from django.db.models.functions import Trunc
 from django.utils import timezone
 from datetime import timedelta
 
@@ -18,19 +26,19 @@ class BaseAnalyticsView(APIView):
 
 
 class OverviewAnalyticsView(BaseAnalyticsView):
+    @conditional_get(Task, Project)
+    @cached_analytics('overview')
     def get(self, request):
-        tasks = Task.objects.all()
         projects = Project.objects.all()
         
-        # Simple high level metrics
-        totalTasks = tasks.count()
-        completedTasks = tasks.filter(status='done').count()
-        inProgressTasks = tasks.filter(status='in_progress').count()
-        todoTasks = tasks.filter(status='todo').count()
-        
-        # Overdue logic
+        # Simple high level metrics, all from one aggregate over the daily rollup
         now = timezone.now().date()
-        overdueTasks = tasks.filter(status__in=['todo', 'in_progress'], due_date__lt=now).count()
+        counts = TaskDailyStat.objects.aggregate(**stat_sums(now))
+        totalTasks = counts['total']
+        completedTasks = counts['done']
+        inProgressTasks = counts['in_progress']
+        todoTasks = counts['todo']
+        overdueTasks = counts['overdue']
         
         return Response({
             'totalTasks': totalTasks,
@@ -44,9 +52,11 @@ class OverviewAnalyticsView(BaseAnalyticsView):
         })
 
 class TaskDistributionView(BaseAnalyticsView):
+    @conditional_get(Task, Project)
+    @cached_analytics('task-distribution')
     def get(self, request):
         # We'll return it grouped by status
-        distribution = Task.objects.values('status').annotate(value=Count('id'))
+        distribution = TaskDailyStat.objects.values('status').annotate(value=task_sum()).filter(value__gt=0).order_by()
         # Standardize the output for recharts (requires name, value)
         data = []
         status_map = {'todo': 'To Do', 'in_progress': 'In Progress', 'done': 'Completed'}
@@ -58,38 +68,57 @@ class TaskDistributionView(BaseAnalyticsView):
         return Response(data)
 
 class TasksOverTimeView(BaseAnalyticsView):
+    """
+    GET: created/completed/pending/overdue counts per bucket.
+    Query params: ?days=7 or ?start=&end= (YYYY-MM-DD), ?granularity=day|week|month.
+    """
+    @conditional_get(Task, Project)
+    @cached_analytics('tasks-over-time')
     def get(self, request):
-        # Build last 7 days chart
-        data = []
         today = timezone.now().date()
-        for i in range(6, -1, -1): # Older days first (e.g. 6 days ago, then 5... up to today 0)
-            d = today - timedelta(days=i)
-            # Find tasks created and completed around these days
-            created = Task.objects.filter(created_at__date=d).count()
-            completed = Task.objects.filter(status='done', created_at__date=d).count() # Simulated roughly
-            pending = Task.objects.filter(status__in=['todo', 'in_progress'], created_at__date=d).count() 
-            overdue = Task.objects.filter(status__in=['todo', 'in_progress'], due_date__lt=today, created_at__date=d).count() 
+        try:
+            start, end, granularity = parse_range(request.query_params, today)
+        except RangeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One grouped query over the daily rollup; buckets with no tasks are filled in below
+        rows = TaskDailyStat.objects.filter(
+            day__gte=start, day__lte=end
+        ).annotate(
+            bucket=Trunc('day', granularity, output_field=DateField())
+        ).values('bucket').annotate(
+            created=task_sum(),
+            completed=task_sum(Q(status='done')), # Simulated roughly
+            pending=task_sum(Q(status__in=OPEN_STATUSES)),
+            overdue=task_sum(Q(status__in=OPEN_STATUSES, due_date__lt=today)),
+        ).order_by('bucket')
+        by_bucket = {row['bucket']: row for row in rows}
 
+        data = []
+        for bucket in bucket_starts(start, end, granularity): # Older buckets first
+            row = by_bucket.get(bucket, {})
             data.append({
-                'date': d.strftime("%Y-%m-%d"), # Frontend uses %Y-%m-%d for strict mapping
-                'created': created,
-                'completed': completed,
-                'pending': pending,
-                'overdue': overdue
+                'date': bucket.strftime("%Y-%m-%d"), # Frontend uses %Y-%m-%d for strict mapping
+                'created': row.get('created', 0),
+                'completed': row.get('completed', 0),
+                'pending': row.get('pending', 0),
+                'overdue': row.get('overdue', 0)
             })
         return Response(data)
 
 class UserProductivityView(BaseAnalyticsView):
+    @conditional_get(Task, Project)
+    @cached_analytics('user-productivity')
     def get(self, request):
-        user_counts = Task.objects.values('assigned_to__first_name', 'assigned_to__last_name').annotate(
-            completed=Count('id', filter=Q(status='done')),
-            assigned=Count('id')
-        ).exclude(assigned_to__isnull=True).order_by('-completed')[:5]
+        user_counts = TaskDailyStat.objects.values('assignee__first_name', 'assignee__last_name').annotate(
+            completed=task_sum(Q(status='done')),
+            assigned=task_sum()
+        ).exclude(assignee__isnull=True).filter(assigned__gt=0).order_by('-completed')[:5]
 
         data = []
         for u in user_counts:
-            fname = u['assigned_to__first_name'] or 'Unknown'
-            lname = u['assigned_to__last_name'] or ''
+            fname = u['assignee__first_name'] or 'Unknown'
+            lname = u['assignee__last_name'] or ''
             data.append({
                 'name': f"{fname} {lname}".strip(),
                 'tasks': u['assigned'],
@@ -98,10 +127,12 @@ class UserProductivityView(BaseAnalyticsView):
         return Response(data)
 
 class ProjectProgressView(BaseAnalyticsView):
+    @conditional_get(Task, Project)
+    @cached_analytics('project-progress')
     def get(self, request):
         projects = Project.objects.annotate(
-            total_tasks=Count('tasks'),
-            completed_tasks=Count('tasks', filter=Q(tasks__status='done'))
+            total_tasks=task_sum(prefix='daily_stats__'),
+            completed_tasks=task_sum(Q(daily_stats__status='done'), prefix='daily_stats__')
         )[:5]
 
         data = []
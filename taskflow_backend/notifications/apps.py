@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications'
+
+    def ready(self):
+        from .retention import scheduler
+        request_started.connect(scheduler.ensure_started, dispatch_uid='notification_retention_scheduler')
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from accounts.middleware import set_request_context
+
+SALT = 'notifications.stream'
+
+
+def stream_token(user):
+    """
+    A signed token naming user, accepted by StreamTokenAuthentication for
+    NOTIFICATION_STREAM_TOKEN_TTL seconds.
+    """
+    return signing.dumps({'user': user.pk}, salt=SALT)
+
+
+class StreamTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates ?token=<stream_token()>, for EventSource clients, which
+    cannot send an Authorization header. The token is short-lived since it
+    shows up in URLs (and so in access logs); it is only checked when a
+    stream opens, so a stream outlives it.
+    """
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        try:
+            payload = signing.loads(token, salt=SALT, max_age=settings.NOTIFICATION_STREAM_TOKEN_TTL)
+        except signing.BadSignature:
+            raise AuthenticationFailed("Stream token is invalid or expired.")
+
+        user = get_user_model().objects.select_related('tenant').filter(pk=payload.get('user')).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User not found or inactive.")
+        set_request_context(request, user)
+        return user, None
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import Tenant
+from notifications.retention import run_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapses repeated task_updated notifications and deletes (optionally archives) "
+        "read notifications older than each tenant's retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help="Only prune notifications of this tenant id.")
+        parser.add_argument('--archive-dir', default=settings.NOTIFICATION_ARCHIVE_DIR,
+                            help="Write expired rows to gzipped NDJSON files here before deleting them.")
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_RETENTION_BATCH,
+                            help="Rows deleted per statement.")
+        parser.add_argument('--pause', type=float, default=settings.NOTIFICATION_RETENTION_PAUSE,
+                            help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        if options['tenant'] is not None and not Tenant.objects.filter(pk=options['tenant']).exists():
+            raise CommandError(f"Tenant {options['tenant']} does not exist.")
+
+        result = run_retention(
+            tenant_id=options['tenant'], archive_dir=options['archive_dir'],
+            batch_size=options['batch_size'], pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Collapsed {result['compacted']} repeated updates, expired {result['expired']} read "
+            f"notifications ({result['archived']} archived)."
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_task_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['tenant', 'created_at', 'id'], name='notif_tenant_read_created_idx'),
+        ),
+    ]
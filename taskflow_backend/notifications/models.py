@@ -13,7 +13,35 @@ class Notification(TenantAwareModel):
     message = models.TextField()
     type = models.CharField(max_length=50, choices=TYPE_CHOICES)
     is_read = models.BooleanField(default=False)
+    # The task the notification is about. No database constraint: rows are written
+    # after the triggering commit and the task may already be gone by then.
+    task = models.ForeignKey(
+        'tasks.Task', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='notifications', db_constraint=False,
+    )
+    # How many events this row stands for; task_updated rows absorb repeats (outbox)
+    count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # NotificationListView: WHERE user_id = ? ORDER BY created_at DESC
+            models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+            # Unread badge and mark-all-read: only unread rows are indexed, so the
+            # count stays cheap however long a user's history grows
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notif_user_unread_idx'),
+            # Write-time dedup: the unread task_updated row of a (user, task)
+            models.Index(
+                fields=['user', 'task'], condition=models.Q(type='task_updated', is_read=False),
+                name='notif_user_task_updated_idx',
+            ),
+            # Retention expiry: a tenant's read rows older than a cutoff, walked
+            # in (created_at, id) batches
+            models.Index(
+                fields=['tenant', 'created_at', 'id'], condition=models.Q(is_read=True),
+                name='notif_tenant_read_created_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.type} for {self.user.email} - Read: {self.is_read}"
@@ -0,0 +1,205 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .stream import announce
+
+logger = logging.getLogger(__name__)
+
+
+def task_event(type, user_id, task):
+    """
+    Captures what a notification about `task` needs without touching any
+    related objects, so the signal handler stays free of extra queries.
+    """
+    return {
+        'type': type,
+        'user_id': user_id,
+        'tenant_id': task.tenant_id,
+        'task_id': task.pk,
+        'title': task.title,
+        'assignee_id': task.assigned_to_id,
+    }
+
+
+def coalesce(events):
+    """
+    Keeps the latest event per (user, type, task), counting the ones it
+    replaces, so ten edits to one task in a batch become a single notification.
+    """
+    latest = {}
+    for event in events:
+        key = (event['user_id'], event['type'], event['task_id'])
+        previous = latest.get(key)
+        latest[key] = dict(event, count=event.get('count', 1) + (previous['count'] if previous else 0))
+    return list(latest.values())
+
+
+def build_message(event, emails):
+    if event['type'] == 'task_assigned':
+        return f"You have been assigned a new task: {event['title']}"
+    if event['type'] == 'task_completed':
+        return f"Task '{event['title']}' assigned to {emails.get(event['assignee_id'], 'someone')} has been completed."
+    return f"Task '{event['title']}' has been updated."
+
+
+def absorb_repeats(events, now):
+    """
+    Folds task_updated events into the user's unread task_updated row for
+    the same task when that row is younger than NOTIFICATION_DEDUP_WINDOW
+    seconds: its message, timestamp and count are refreshed with one UPDATE.
+    Returns the events that still need a row of their own.
+    """
+    from .models import Notification
+
+    window = settings.NOTIFICATION_DEDUP_WINDOW
+    updates = [i for i, event in enumerate(events) if event['type'] == 'task_updated']
+    if not window or not updates:
+        return events
+
+    # Ordered by id, so the newest row wins should a (user, task) have several
+    existing = {
+        (user_id, task_id): pk
+        for pk, user_id, task_id in Notification._base_manager.filter(
+            type='task_updated', is_read=False, created_at__gte=now - timedelta(seconds=window),
+            user_id__in={events[i]['user_id'] for i in updates},
+            task_id__in={events[i]['task_id'] for i in updates},
+        ).order_by('id').values_list('id', 'user_id', 'task_id')
+    }
+    absorbed, rows = set(), []
+    for i in updates:
+        pk = existing.get((events[i]['user_id'], events[i]['task_id']))
+        if pk is not None:
+            absorbed.add(i)
+            rows.append(Notification(
+                id=pk, message=events[i]['message'], created_at=now, count=F('count') + events[i]['count'],
+            ))
+    if rows:
+        Notification._base_manager.bulk_update(rows, ['message', 'created_at', 'count'])
+    return [event for i, event in enumerate(events) if i not in absorbed]
+
+
+def write_notifications(events):
+    """
+    Turns a batch of events into Notification rows with one email lookup,
+    one UPDATE for repeats absorbed into recent rows and one bulk INSERT.
+    """
+    from accounts.models import User
+    from .models import Notification
+
+    events = coalesce(events)
+    if not events:
+        return []
+
+    assignee_ids = {e['assignee_id'] for e in events if e['type'] == 'task_completed'}
+    emails = dict(User.objects.filter(id__in=assignee_ids).values_list('id', 'email')) if assignee_ids else {}
+    for event in events:
+        event['message'] = build_message(event, emails)
+
+    remaining = absorb_repeats(events, timezone.now())
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=event['user_id'],
+            tenant_id=event['tenant_id'],
+            task_id=event['task_id'],
+            type=event['type'],
+            message=event['message'],
+            count=event['count'],
+        )
+        for event in remaining
+    ])
+    # bulk_create and bulk_update send no post_save, so open streams are woken from here
+    announce(event['user_id'] for event in events)
+    return notifications
+
+
+class NotificationOutbox:
+    """
+    In-process outbox for notifications.
+    publish() only appends to a queue once the surrounding transaction commits;
+    a daemon thread drains the queue in batches, coalesces them and writes
+    with bulk_create. No broker involved. Set NOTIFICATION_DISPATCH = 'sync'
+    to write inline instead (management commands, debugging).
+    """
+    def __init__(self, batch_size=500, linger=0.2):
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def publish(self, event):
+        if settings.NOTIFICATION_DISPATCH == 'sync':
+            transaction.on_commit(lambda: write_notifications([event]))
+            return
+        transaction.on_commit(lambda: self._enqueue(event))
+
+    def publish_many(self, events):
+        """
+        publish() for a batch; in sync mode the batch is written with one
+        bulk_create instead of one per event.
+        """
+        events = list(events)
+        if not events:
+            return
+        if settings.NOTIFICATION_DISPATCH == 'sync':
+            transaction.on_commit(lambda: write_notifications(events))
+            return
+        transaction.on_commit(lambda: [self._enqueue(event) for event in events])
+
+    def flush(self):
+        """
+        Writes whatever is queued right now on the calling thread.
+        """
+        events = self._drain()
+        if events:
+            write_notifications(events)
+
+    def _enqueue(self, event):
+        self._ensure_worker()
+        self._queue.put(event)
+
+    def _ensure_worker(self):
+        # Started lazily and per process, so forking servers get their own thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='notification-outbox', daemon=True)
+                self._thread.start()
+
+    def _drain(self, first=None):
+        events = [] if first is None else [first]
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            # Give bursts (bulk edits) a moment to pile up so they coalesce
+            time.sleep(self.linger)
+            events = self._drain(first)
+            try:
+                close_old_connections()
+                write_notifications(events)
+            except Exception:
+                logger.exception("Failed to write %d notification(s)", len(events))
+            finally:
+                close_old_connections()
+
+
+outbox = NotificationOutbox()
+atexit.register(outbox.flush)
@@ -0,0 +1,201 @@
+import gzip
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Case, Count, Exists, F, Max, OuterRef, PositiveIntegerField, Q, Value, When
+from django.utils import timezone
+from taskflow_backend.exports import ndjson_lines
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ('id', 'tenant_id', 'user_id', 'task_id', 'type', 'message', 'count', 'is_read', 'created_at')
+# One retention run per interval across processes sharing the cache
+LOCK_KEY = 'notifications:retention:lock'
+
+
+def _delete_in_batches(queryset, batch_size, pause, archive=None):
+    """
+    Deletes the rows of queryset a batch at a time, each batch its own short
+    statement, so no long lock is held on the table. Batches walk the rows
+    in (created_at, id) order from where the previous batch ended, rather
+    than from the start again, so no batch rescans the index entries of
+    rows already deleted (which linger until VACUUM).
+    archive(rows) is handed every batch before it is deleted.
+    """
+    deleted = 0
+    after = Q()
+    while True:
+        batch = queryset.filter(after).order_by('created_at', 'id')
+        if archive is None:
+            rows = list(batch.values('id', 'created_at')[:batch_size])
+        else:
+            rows = list(batch.values(*ARCHIVE_COLUMNS)[:batch_size])
+            archive(rows)
+        if not rows:
+            return deleted
+        deleted += Notification._base_manager.filter(id__in=[row['id'] for row in rows]).delete()[0]
+        if len(rows) < batch_size:
+            return deleted
+        last = rows[-1]
+        after = Q(created_at__gt=last['created_at']) | Q(created_at=last['created_at'], id__gt=last['id'])
+        if pause:
+            time.sleep(pause)
+
+
+def compact_task_updates(tenant_id=None, batch_size=1000, pause=0):
+    """
+    Collapses repeated task_updated notifications of a user into the newest
+    one, matched on their task, or on the message (which names the task) for
+    rows without one. The newest row is kept, read or not, and its count
+    grows by the counts of the rows it absorbs. The rows to remove are found
+    once per run; batches then only read and delete their own rows.
+    """
+    queryset = Notification._base_manager.filter(type='task_updated')
+    if tenant_id is not None:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    newer = Notification._base_manager.filter(
+        user_id=OuterRef('user_id'), type='task_updated', id__gt=OuterRef('id'),
+    )
+    by_task = queryset.filter(task__isnull=False).filter(Exists(newer.filter(task_id=OuterRef('task_id'))))
+    by_message = queryset.filter(task__isnull=True).filter(
+        Exists(newer.filter(task__isnull=True, message=OuterRef('message')))
+    )
+    doomed = sorted([*by_task.values_list('id', flat=True), *by_message.values_list('id', flat=True)])
+    if not doomed:
+        return 0
+
+    # Newest row of every group with repeats, by (user, match field, value)
+    newest = {}
+    for field, rows in (('task_id', queryset.filter(task__isnull=False)), ('message', queryset.filter(task__isnull=True))):
+        groups = rows.order_by().values('user_id', field).annotate(newest=Max('id'), rows=Count('id')).filter(rows__gt=1)
+        for group in groups:
+            newest[group['user_id'], field, group[field]] = group['newest']
+
+    compacted = 0
+    for start in range(0, len(doomed), batch_size):
+        ids = doomed[start:start + batch_size]
+        absorbed = Counter()
+        for row in Notification._base_manager.filter(id__in=ids).values('user_id', 'task_id', 'message', 'count'):
+            field = 'message' if row['task_id'] is None else 'task_id'
+            kept = newest.get((row['user_id'], field, row[field]))
+            if kept is not None:
+                absorbed[kept] += row['count']
+        with transaction.atomic():
+            if absorbed:
+                # F() so counts the outbox adds meanwhile are not overwritten
+                Notification._base_manager.filter(id__in=absorbed).update(count=F('count') + Case(
+                    *(When(id=pk, then=Value(n)) for pk, n in absorbed.items()),
+                    output_field=PositiveIntegerField(),
+                ))
+            compacted += Notification._base_manager.filter(id__in=ids).delete()[0]
+        if pause and start + batch_size < len(doomed):
+            time.sleep(pause)
+    return compacted
+
+
+class Archive:
+    """
+    Appends archived rows to one gzipped NDJSON file per tenant and run,
+    under <archive_dir>/tenant-<id>/.
+    """
+    def __init__(self, archive_dir, tenant_id, now):
+        directory = os.path.join(archive_dir, f'tenant-{tenant_id}')
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"notifications-{now.strftime('%Y%m%dT%H%M%S')}.ndjson.gz")
+        self.rows = 0
+
+    def __call__(self, rows):
+        if not rows:
+            return
+        with gzip.open(self.path, 'at', encoding='utf-8') as f:
+            f.writelines(ndjson_lines(ARCHIVE_COLUMNS, rows))
+        self.rows += len(rows)
+
+
+def expire_read(tenant_id=None, archive_dir=None, batch_size=1000, pause=0, now=None):
+    """
+    Deletes read notifications older than each tenant's retention period,
+    first appending them to an archive file when archive_dir is set.
+    Returns (deleted, archived).
+    """
+    from accounts.models import Tenant
+
+    now = now or timezone.now()
+    tenants = Tenant.objects.values_list('id', 'notification_retention_days')
+    if tenant_id is not None:
+        tenants = tenants.filter(id=tenant_id)
+
+    deleted = archived = 0
+    for tenant, days in tenants:
+        days = days if days is not None else settings.NOTIFICATION_RETENTION_DAYS
+        if not days:
+            continue
+        expired = Notification._base_manager.filter(
+            tenant_id=tenant, is_read=True, created_at__lt=now - timedelta(days=days),
+        )
+        archive = Archive(archive_dir, tenant, now) if archive_dir else None
+        deleted += _delete_in_batches(expired, batch_size, pause, archive)
+        archived += archive.rows if archive else 0
+    return deleted, archived
+
+
+def run_retention(tenant_id=None, archive_dir=None, batch_size=1000, pause=0):
+    """
+    One full pass: compaction, then expiry. Returns counts per step.
+    """
+    compacted = compact_task_updates(tenant_id, batch_size, pause)
+    deleted, archived = expire_read(tenant_id, archive_dir, batch_size, pause)
+    return {'compacted': compacted, 'expired': deleted, 'archived': archived}
+
+
+class RetentionScheduler:
+    """
+    Runs run_retention() every NOTIFICATION_RETENTION_INTERVAL seconds from a
+    daemon thread, started on the first request a process serves (so
+    management commands never start it). A cache.add lock lets only one
+    process per interval do the work. An interval of 0 disables it.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self, **kwargs):
+        if not settings.NOTIFICATION_RETENTION_INTERVAL:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='notification-retention', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = settings.NOTIFICATION_RETENTION_INTERVAL
+        while True:
+            time.sleep(interval)
+            if not cache.add(LOCK_KEY, os.getpid(), interval):
+                continue
+            try:
+                close_old_connections()
+                result = run_retention(
+                    archive_dir=settings.NOTIFICATION_ARCHIVE_DIR,
+                    batch_size=settings.NOTIFICATION_RETENTION_BATCH,
+                    pause=settings.NOTIFICATION_RETENTION_PAUSE,
+                )
+                logger.info("Notification retention: %s", result)
+            except Exception:
+                logger.exception("Notification retention run failed")
+            finally:
+                close_old_connections()
+
+
+scheduler = RetentionScheduler()
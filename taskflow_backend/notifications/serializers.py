@@ -4,5 +4,17 @@ from .models import Notification
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'user', 'message', 'type', 'is_read', 'tenant', 'created_at']
-        read_only_fields = ['id', 'user', 'message', 'type', 'tenant', 'created_at']
+        fields = ['id', 'user', 'message', 'type', 'is_read', 'task', 'count', 'tenant', 'created_at']
+        read_only_fields = ['id', 'user', 'message', 'type', 'task', 'count', 'tenant', 'created_at']
+
+class NotificationReadSerializer(serializers.Serializer):
+    """
+    Body of the bulk mark-read endpoint: either {"ids": [...]} or {"all": true}.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    all = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        if not data['all'] and not data.get('ids'):
+            raise serializers.ValidationError('Provide "ids" or "all": true.')
+        return data
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'taskflow_notifications'
+# NOTIFY payloads are capped at 8000 bytes; user ids are sent in chunks well below that
+NOTIFY_CHUNK = 500
+
+
+class Subscription:
+    """
+    One open stream's wake-up signal. Threaded (WSGI) streams block on a
+    threading.Event; async (ASGI) ones await an asyncio.Event that other
+    threads set through the owning loop.
+    """
+    def __init__(self, user_id, loop=None):
+        self.user_id = user_id
+        self._loop = loop
+        self._event = asyncio.Event() if loop else threading.Event()
+
+    def notify(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._event.set)
+        else:
+            self._event.set()
+
+    def wait(self, timeout):
+        fired = self._event.wait(timeout)
+        self._event.clear()
+        return fired
+
+    async def wait_async(self, timeout):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            fired = True
+        except asyncio.TimeoutError:
+            fired = False
+        self._event.clear()
+        return fired
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub of "user X has new notifications" wake-ups. Messages
+    carry no rows: a woken stream reads everything past its last event id,
+    which also covers resume and any wake-up it missed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id, loop=None):
+        if listening():
+            listener.ensure_started()
+        subscription = Subscription(user_id, loop)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_ids):
+        with self._lock:
+            subscriptions = [s for user_id in set(user_ids) for s in self._subscribers.get(user_id, ())]
+        for subscription in subscriptions:
+            subscription.notify()
+
+
+def listening():
+    """
+    Whether processes relay wake-ups to each other through LISTEN/NOTIFY:
+    the 'postgres' backend with a direct (unpooled) listener database.
+    """
+    return (
+        settings.NOTIFICATION_STREAM_BACKEND == 'postgres'
+        and settings.NOTIFICATION_STREAM_LISTEN_DATABASE is not None
+    )
+
+
+class PostgresListener:
+    """
+    Relays NOTIFY messages on CHANNEL to this process's broker, so a stream
+    is woken no matter which worker wrote the notification. Runs in a daemon
+    thread on its own connection to NOTIFICATION_STREAM_LISTEN_DATABASE (LISTEN
+    does not survive a transaction-mode pooler), reconnecting after errors.
+    """
+    def __init__(self, poll_timeout=5.0, retry_delay=2.0):
+        self.poll_timeout = poll_timeout
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='notification-listener', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            db = connections.create_connection(settings.NOTIFICATION_STREAM_LISTEN_DATABASE)
+            try:
+                db.ensure_connection()
+                raw = db.connection
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([raw], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    raw.poll()
+                    user_ids = []
+                    while raw.notifies:
+                        user_ids.extend(json.loads(raw.notifies.pop(0).payload))
+                    if user_ids:
+                        broker.publish(user_ids)
+            except Exception:
+                logger.exception("Notification listener lost its connection; reconnecting")
+            finally:
+                db.close()
+            time.sleep(self.retry_delay)
+
+
+def announce(user_ids):
+    """
+    Wakes the streams of users who just got notifications: directly in this
+    process, or through NOTIFY (delivered on commit) for every process when
+    listening().
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    if not listening() or connection.vendor != 'postgresql':
+        broker.publish(user_ids)
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), NOTIFY_CHUNK):
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(user_ids[start:start + NOTIFY_CHUNK])])
+
+
+broker = NotificationBroker()
+listener = PostgresListener()
@@ -0,0 +1,73 @@
+import tempfile
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from accounts.middleware import tenant_context
+from accounts.models import Tenant, User
+from projects.models import Project
+from tasks.models import Task
+from .models import Notification
+from .retention import compact_task_updates, expire_read
+
+
+class CompactTaskUpdatesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        with tenant_context(cls.tenant):
+            cls.user = User.objects.create_user('employee@acme.test', tenant=cls.tenant)
+            project = Project.objects.create(name='Web')
+            cls.task = Task.objects.create(project=project, title='Ship it')
+
+    def notify(self, count, task=None, message="Task 'Ship it' was updated."):
+        return Notification.objects.create(
+            tenant=self.tenant, user=self.user, type='task_updated', task=task, message=message, count=count,
+        )
+
+    def test_repeats_fold_into_newest_row_with_their_counts(self):
+        for count in (2, 1, 3):
+            kept_by_task = self.notify(count, task=self.task)
+        for count in (1, 4):
+            kept_by_message = self.notify(count)
+        other = self.notify(1, message="Task 'Other' was updated.")
+
+        # Batches of one: every batch has to find its kept row again
+        self.assertEqual(compact_task_updates(batch_size=1), 3)
+        self.assertEqual(
+            dict(Notification.objects.values_list('id', 'count')),
+            {kept_by_task.pk: 6, kept_by_message.pk: 5, other.pk: 1},
+        )
+        self.assertEqual(compact_task_updates(), 0)
+
+
+class ExpireReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme', notification_retention_days=30)
+        with tenant_context(cls.tenant):
+            cls.user = User.objects.create_user('employee@acme.test', tenant=cls.tenant)
+
+    def test_expired_read_rows_go_in_keyset_batches(self):
+        now = timezone.now()
+        old, recent = now - timedelta(days=40), now - timedelta(days=5)
+        rows = Notification.objects.bulk_create(
+            Notification(tenant=self.tenant, user=self.user, type='task_updated', message=f'#{i}', is_read=is_read)
+            for i, is_read in enumerate([True] * 5 + [False, True])
+        )
+        # Ties on created_at must not stop or repeat a batch
+        Notification.objects.filter(pk__in=[row.pk for row in rows[:3]]).update(created_at=old)
+        Notification.objects.filter(pk__in=[row.pk for row in rows[3:6]]).update(created_at=old - timedelta(days=1))
+        Notification.objects.filter(pk=rows[6].pk).update(created_at=recent)
+
+        with tempfile.TemporaryDirectory() as archive_dir, CaptureQueriesContext(connection) as queries:
+            self.assertEqual(expire_read(archive_dir=archive_dir, batch_size=2, now=now), (5, 5))
+        self.assertEqual(set(Notification.objects.values_list('pk', flat=True)), {rows[5].pk, rows[6].pk})
+        # Every batch after the first starts where the previous one ended
+        selects = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "notifications_notification"' in q['sql']
+        ]
+        self.assertEqual(len(selects), 3)
+        self.assertTrue(all('"created_at" >' in sql for sql in selects[1:]))
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import NotificationListView, NotificationMarkReadView
+from .views import (
+    NotificationListView, NotificationMarkReadView, NotificationStreamView,
+    NotificationStreamTokenView, NotificationBulkReadView, NotificationUnreadCountView,
+)
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification_list'),
+    path('stream/', NotificationStreamView.as_view(), name='notification_stream'),
+    path('stream/token/', NotificationStreamTokenView.as_view(), name='notification_stream_token'),
+    path('read/', NotificationBulkReadView.as_view(), name='notification_bulk_read'),
+    path('unread-count/', NotificationUnreadCountView.as_view(), name='notification_unread_count'),
     path('<int:pk>/read/', NotificationMarkReadView.as_view(), name='notification_mark_read'),
 ]
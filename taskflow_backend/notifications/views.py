@@ -1,7 +1,27 @@
-from rest_framework import generics, permissions, status
+import asyncio
+import functools
+import json
+import time
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, permissions, renderers, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from .authentication import StreamTokenAuthentication, stream_token
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, NotificationReadSerializer
+from .stream import broker
+
+# Rows sent per read; a stream keeps reading until it has caught up
+STREAM_BATCH = 100
+# How long EventSource clients wait before reconnecting (with Last-Event-ID)
+STREAM_RETRY_MS = 3000
+UPDATE_OVERLAP = timedelta(seconds=2)
 
 class NotificationListView(generics.ListAPIView):
     """
@@ -26,7 +46,210 @@ class NotificationMarkReadView(generics.UpdateAPIView):
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.is_read = True
-        instance.save()
+        if not instance.is_read:
+            instance.is_read = True
+            instance.save(update_fields=['is_read'])
         serializer = self.get_serializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+def unread_count(user):
+    return Notification.objects.filter(user=user, is_read=False).count()
+
+class NotificationBulkReadView(APIView):
+    """
+    POST: Marks the requester's notifications read in a single UPDATE, either
+    the given {"ids": [...]} or {"all": true}. Returns how many changed and
+    the new unread count.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = NotificationReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        unread = Notification.objects.filter(user=request.user, is_read=False)
+        if not serializer.validated_data['all']:
+            unread = unread.filter(id__in=serializer.validated_data['ids'])
+        updated = unread.update(is_read=True)
+        return Response({"updated": updated, "unread": unread_count(request.user)}, status=status.HTTP_200_OK)
+
+class NotificationUnreadCountView(APIView):
+    """
+    GET: The requester's unread notification count, for the badge. Served
+    from the partial notif_user_unread_idx index.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": unread_count(request.user)}, status=status.HTTP_200_OK)
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """
+    Lets DRF accept `Accept: text/event-stream`; only error responses
+    (e.g. 401) are rendered through it, as JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+def format_event(row):
+    return f"id: {row['id']}\nevent: notification\ndata: {json.dumps(row)}\n\n"
+
+
+def format_update(row):
+    # No id: a repeat absorbed into an earlier row must not move the client's Last-Event-ID
+    return f"event: notification-updated\ndata: {json.dumps(row)}\n\n"
+
+
+class NotificationStreamView(APIView):
+    """
+    GET: Server-Sent Events stream of the requester's new notifications.
+    Each event's id is the notification id; a reconnecting client sends it
+    back as Last-Event-ID and gets everything it missed. Without one, the
+    stream starts after the newest existing notification. task_updated rows
+    that absorb a repeat (outbox) are re-sent as notification-updated events
+    while the stream is open.
+    Streams are woken through notifications.stream (in-process, or across
+    processes with NOTIFICATION_STREAM_BACKEND = 'postgres'); the heartbeat
+    also re-checks the table, so a missed wake-up costs at most one heartbeat.
+    Streams close after NOTIFICATION_STREAM_MAX_AGE seconds and the client
+    reconnects, which also bounds streams whose client went away unnoticed.
+    Run this route on ASGI workers: there a stream is a coroutine and holds a
+    database connection only while it reads. Under WSGI it works, but each
+    open stream ties up a worker thread for up to the max age.
+    EventSource cannot send an Authorization header: such clients open the
+    stream with ?token= from NotificationStreamTokenView and, since that
+    token expires quickly, reconnect themselves with a fresh one and
+    ?last_event_id=.
+    """
+    authentication_classes = [*APIView.authentication_classes, StreamTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [renderers.JSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        user = request.user
+        last_event_id = request.headers.get('Last-Event-ID', request.query_params.get('last_event_id'))
+        if last_event_id is not None:
+            try:
+                last_id = int(last_event_id)
+            except ValueError:
+                return Response({"error": "Last-Event-ID must be a notification id."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            last_id = Notification._base_manager.filter(
+                user_id=user.pk, tenant_id=user.tenant_id,
+            ).order_by('-id').values_list('id', flat=True).first() or 0
+
+        def fetch(after, since):
+            # Explicit tenant filter: the body is streamed after the middleware cleared the tenant
+            mine = Notification._base_manager.filter(user_id=user.pk, tenant_id=user.tenant_id)
+            rows = mine.filter(id__gt=after).order_by('id')[:STREAM_BATCH]
+            updated = mine.filter(
+                id__lte=after, type='task_updated', is_read=False, created_at__gte=since,
+            ).order_by('id')[:STREAM_BATCH]
+            return (
+                [dict(row) for row in NotificationSerializer(rows, many=True).data],
+                [dict(row) for row in NotificationSerializer(updated, many=True).data],
+            )
+
+        stream = _async_events if isinstance(request._request, ASGIRequest) else _events
+        response = StreamingHttpResponse(stream(user.pk, _released(fetch), last_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+class NotificationStreamTokenView(APIView):
+    """
+    POST: A token to open the notification stream with as ?token=, valid for
+    NOTIFICATION_STREAM_TOKEN_TTL seconds. For EventSource clients, which
+    cannot send the Authorization header; get a new one for every connect.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response(
+            {"token": stream_token(request.user), "expires_in": settings.NOTIFICATION_STREAM_TOKEN_TTL},
+            status=status.HTTP_200_OK,
+        )
+
+
+def _released(fetch):
+    """
+    Wraps fetch to close its thread's database connection after each read,
+    so a stream waiting between reads does not keep a connection (nor, under
+    ASGI, one per executor thread). Not inside an atomic block (tests), where
+    closing would break the transaction.
+    """
+    @functools.wraps(fetch)
+    def wrapper(*args):
+        try:
+            return fetch(*args)
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+    return wrapper
+
+
+def _events(user_id, fetch, last_id):
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        deadline = time.monotonic() + settings.NOTIFICATION_STREAM_MAX_AGE
+        since, sent = timezone.now(), {}
+        while True:
+            # Overlap consecutive reads a little, against clock skew between workers,
+            # and skip updates the previous read already sent
+            checked = timezone.now() - UPDATE_OVERLAP
+            rows, updated = fetch(last_id, since)
+            since, previous = checked, sent
+            sent = {row['id']: row['created_at'] for row in updated + rows}
+            for row in updated:
+                if previous.get(row['id']) != row['created_at']:
+                    yield format_update(row)
+            for row in rows:
+                last_id = row['id']
+                yield format_event(row)
+            if len(rows) == STREAM_BATCH:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not subscription.wait(min(settings.NOTIFICATION_STREAM_HEARTBEAT, remaining)):
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def _async_events(user_id, fetch, last_id):
+    subscription = broker.subscribe(user_id, loop=asyncio.get_running_loop())
+    # Not thread-sensitive: reads of many streams must not queue up behind
+    # each other (and every other sync view) on the one shared thread
+    fetch = sync_to_async(fetch, thread_sensitive=False)
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        deadline = time.monotonic() + settings.NOTIFICATION_STREAM_MAX_AGE
+        since, sent = timezone.now(), {}
+        while True:
+            # Overlap consecutive reads a little, against clock skew between workers,
+            # and skip updates the previous read already sent
+            checked = timezone.now() - UPDATE_OVERLAP
+            rows, updated = await fetch(last_id, since)
+            since, previous = checked, sent
+            sent = {row['id']: row['created_at'] for row in updated + rows}
+            for row in updated:
+                if previous.get(row['id']) != row['created_at']:
+                    yield format_update(row)
+            for row in rows:
+                last_id = row['id']
+                yield format_event(row)
+            if len(rows) == STREAM_BATCH:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not await subscription.wait_async(min(settings.NOTIFICATION_STREAM_HEARTBEAT, remaining)):
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
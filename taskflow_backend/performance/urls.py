@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import PerformanceDashboardView
+from .views import PerformanceDashboardView, PerformanceExportView
 
 urlpatterns = [
     path('dashboard', PerformanceDashboardView.as_view(), name='performance-dashboard'),
+    path('export', PerformanceExportView.as_view(), name='performance-export'),
 ]
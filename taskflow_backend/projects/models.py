@@ -1,6 +1,37 @@
 from django.db import models
-from accounts.middleware import TenantAwareModel
+from accounts.middleware import TenantAwareModel, TenantAwareManager
 from django.conf import settings
+from accounts.hierarchy import visible_users_q
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, effective_user):
+        """
+        Projects in the user's tenant; below super admin, only those with at
+        least one member the user can see. A semi-join, so projects never
+        repeat and no DISTINCT is needed.
+        """
+        qs = self.filter(tenant=effective_user.tenant_id)
+        if effective_user.role == 'super_admin':
+            return qs
+        return qs.filter(models.Exists(ProjectMember.objects.filter(
+            visible_users_q(effective_user, 'user'),
+            project=models.OuterRef('pk'),
+        )))
+
+    def with_members(self):
+        """
+        Loads the creator in the same query and every membership with its user
+        in one prefetch, restricted to the columns ProjectSerializer renders,
+        so listing projects costs two queries no matter how many members.
+        """
+        project_fields = [f.name for f in self.model._meta.concrete_fields]
+        member_fields = [f.name for f in ProjectMember._meta.concrete_fields]
+        members = ProjectMember.objects.select_related('user').only(
+            *member_fields, 'user__first_name', 'user__last_name', 'user__email',
+        )
+        return self.select_related('created_by').only(
+            *project_fields, 'created_by__first_name', 'created_by__last_name',
+        ).prefetch_related(models.Prefetch('members', queryset=members))
 
 class Project(TenantAwareModel):
     STATUS_CHOICES = [
@@ -12,6 +43,10 @@ class Project(TenantAwareModel):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='created_projects')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also bumped when memberships change, see projects.signals
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantAwareManager.from_queryset(ProjectQuerySet)()
 
     def __str__(self):
         return self.name
@@ -18,8 +18,8 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Project
-        fields = ['id', 'name', 'description', 'status', 'created_by', 'created_by_name', 'created_at', 'members']
-        read_only_fields = ['id', 'created_by', 'created_at']
+        fields = ['id', 'name', 'description', 'status', 'created_by', 'created_by_name', 'created_at', 'updated_at', 'members']
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
 
     def get_created_by_name(self, obj):
         if obj.created_by:
@@ -27,12 +27,12 @@ class ProjectSerializer(serializers.ModelSerializer):
         return "Unknown"
 
     def create(self, validated_data):
-        from accounts.middleware import _thread_locals
+        from accounts.middleware import set_current_tenant
         request = self.context.get('request')
         
         if request and request.user:
-            # Explicitly set thread-local for TenantAwareModel.save()
-            _thread_locals.tenant = request.user.tenant
+            # Explicitly set the tenant context for TenantAwareModel.save()
+            set_current_tenant(request.user.tenant)
             validated_data['tenant'] = request.user.tenant
             validated_data['created_by'] = request.user
             
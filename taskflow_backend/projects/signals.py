@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from taskflow_backend.conditional import bump_change_version
+from .models import Project, ProjectMember
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed_handler(sender, instance, **kwargs):
+    bump_change_version(instance.tenant_id, Project)
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def project_member_changed_handler(sender, instance, **kwargs):
+    # Members are part of the project payload, so they change its ETag too
+    Project._base_manager.filter(pk=instance.project_id).update(updated_at=timezone.now())
+    bump_change_version(instance.tenant_id, Project)
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.middleware import tenant_context
+from accounts.models import Tenant, User
+from .models import Project, ProjectMember
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Pins the number of queries of the project list, whatever the number of
+    projects and members.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Acme')
+        with tenant_context(cls.tenant):
+            cls.admin = User.objects.create_user(
+                'admin@acme.test', 'Test@123', tenant=cls.tenant, role='super_admin', first_name='Ada', last_name='Admin',
+            )
+            staff = [
+                User.objects.create_user(
+                    f'employee{i}@acme.test', 'Test@123', tenant=cls.tenant, role='employee',
+                    first_name='Emp', last_name=str(i), reports_to=cls.admin,
+                )
+                for i in range(4)
+            ]
+            for p in range(5):
+                project = Project.objects.create(name=f'Project {p}', created_by=cls.admin)
+                for user in staff:
+                    ProjectMember.objects.create(project=project, user=user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+
+    def test_project_list(self):
+        self.client.get('/api/v1/projects/')
+        # user, projects, members prefetched with their users
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data[0]['members']), 4)
@@ -1,7 +1,10 @@
 from rest_framework import generics, permissions, viewsets, status
 from rest_framework.response import Response
+from django.db.models import Count, F
 from .models import Project, ProjectMember
 from .serializers import ProjectSerializer, ProjectMemberSerializer
+from taskflow_backend.exports import ExportView, iterate_in_chunks
+from taskflow_backend.conditional import conditional_get
 
 class ProjectListCreateView(generics.ListCreateAPIView):
     """
@@ -11,30 +14,13 @@ class ProjectListCreateView(generics.ListCreateAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def _get_allowed_users_for(self, effective_user):
-        from accounts.models import User
-        if effective_user.role == 'super_admin':
-            return User.objects.filter(tenant=effective_user.tenant)
-        elif effective_user.role == 'admin':
-            subordinates = User.objects.filter(reports_to=effective_user)
-            sub_subordinates = User.objects.filter(reports_to__in=subordinates)
-            return User.objects.filter(id__in=list(subordinates.values_list('id', flat=True)) + list(sub_subordinates.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'manager':
-            employees = User.objects.filter(reports_to=effective_user)
-            return User.objects.filter(id__in=list(employees.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'employee':
-            return User.objects.filter(id=effective_user.id)
-        return User.objects.none()
+    @conditional_get(Project)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
         user = getattr(self.request, 'effective_user', self.request.user)
-        base_qs = Project.objects.filter(tenant=user.tenant)
-        
-        if user.role == 'super_admin':
-            return base_qs
-            
-        allowed_users = self._get_allowed_users_for(user)
-        return base_qs.filter(members__user__in=allowed_users).distinct()
+        return Project.objects.visible_to(user).with_members()
 
     def perform_create(self, serializer):
         serializer.save()
@@ -46,15 +32,27 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(Project)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         user = getattr(self.request, 'effective_user', self.request.user)
-        base_qs = Project.objects.filter(tenant=user.tenant)
-        
-        if user.role == 'super_admin':
-            return base_qs
-            
-        allowed_users = ProjectListCreateView._get_allowed_users_for(self, user)
-        return base_qs.filter(members__user__in=allowed_users).distinct()
+        return Project.objects.visible_to(user).with_members()
+
+class ProjectExportView(ExportView):
+    """
+    GET: Streams every project the user can see as CSV or NDJSON.
+    """
+    columns = ('id', 'name', 'description', 'status', 'created_by_email', 'member_count', 'created_at')
+    filename = 'projects'
+
+    def get_rows(self, effective_user):
+        projects = Project.objects.visible_to(effective_user).annotate(
+            created_by_email=F('created_by__email'),
+            member_count=Count('members'),
+        ).values(*self.columns)
+        return iterate_in_chunks(projects)
 
 class ProjectMemberViewSet(viewsets.ModelViewSet):
     """
@@ -67,7 +65,7 @@ class ProjectMemberViewSet(viewsets.ModelViewSet):
         project_id = self.request.query_params.get('project_id')
         user = getattr(self.request, 'effective_user', self.request.user)
         
-        qs = ProjectMember.objects.all()
+        qs = ProjectMember.objects.select_related('user')
         if project_id:
             qs = qs.filter(project_id=project_id)
         
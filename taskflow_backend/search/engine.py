@@ -0,0 +1,133 @@
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField
+from django.db.models.expressions import RawSQL
+from accounts.hierarchy import visible_users_q
+from accounts.models import User
+from projects.models import Project
+from tasks.models import Task
+from taskflow_backend.exports import iterate_in_chunks
+from . import index
+
+KINDS = ('task', 'project', 'user')
+MAX_TERMS = 8
+# Weights of the fallback index; title-like fields count double, like the
+# A/B weights of the PostgreSQL vectors (search/migrations/0001)
+TITLE, BODY = 2, 1
+
+
+def document_fields(kind, row):
+    """
+    The (text, weight) pairs indexed for a task, project or user, from a
+    model instance or a values() dict.
+    """
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+    if kind == 'task':
+        return [(get('title'), TITLE), (get('description'), BODY)]
+    if kind == 'project':
+        return [(get('name'), TITLE), (get('description'), BODY)]
+    return [(get('first_name'), TITLE), (get('last_name'), TITLE), (get('email'), BODY)]
+
+
+DOCUMENT_COLUMNS = {
+    'task': ('id', 'title', 'description'),
+    'project': ('id', 'name', 'description'),
+    'user': ('id', 'first_name', 'last_name', 'email'),
+}
+
+
+def scoped_querysets(effective_user):
+    """
+    What effective_user may find, per kind; the same scoping as the list views.
+    """
+    return {
+        'task': Task.objects.visible_to(effective_user).annotate(
+            project_name=F('project__name'),
+        ).values('id', 'title', 'status', 'project_name'),
+        'project': Project.objects.visible_to(effective_user).values('id', 'name', 'status'),
+        'user': User.objects.filter(tenant_id=effective_user.tenant_id).filter(
+            visible_users_q(effective_user)
+        ).values('id', 'first_name', 'last_name', 'email', 'role'),
+    }
+
+
+def to_result(kind, row, rank):
+    if kind == 'task':
+        title, subtitle = row['title'], row['project_name']
+    elif kind == 'project':
+        title, subtitle = row['name'], row['status']
+    else:
+        title, subtitle = f"{row['first_name']} {row['last_name']}".strip(), row['email']
+    return {'type': kind, 'id': row['id'], 'title': title, 'subtitle': subtitle, 'rank': rank}
+
+
+def search(effective_user, text, kinds=KINDS, offset=0, limit=20):
+    """
+    Ranked matches for text across the requested kinds, each term matched as
+    a word prefix. Returns (results, has_more).
+    """
+    terms = index.tokenize(text)[:MAX_TERMS]
+    if not terms:
+        return [], False
+    querysets = {kind: qs for kind, qs in scoped_querysets(effective_user).items() if kind in kinds}
+    if connection.vendor == 'postgresql':
+        ranked = _search_postgres(querysets, terms, offset + limit + 1)
+    else:
+        ranked = _search_index(effective_user.tenant_id, querysets, terms, offset + limit + 1)
+    return ranked[offset:offset + limit], len(ranked) > offset + limit
+
+
+def _search_postgres(querysets, terms, wanted):
+    """
+    Uses the generated search_vector columns and their GIN indexes: every
+    kind returns its best `wanted` rows by ts_rank and the lists are merged.
+    """
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    results = []
+    for kind, qs in querysets.items():
+        table = qs.model._meta.db_table
+        matches = RawSQL(
+            f"{table}.search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f"ts_rank({table}.search_vector, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()
+        )
+        rows = qs.filter(matches).annotate(rank=rank).order_by('-rank', '-id')[:wanted]
+        results.extend(to_result(kind, row, row['rank']) for row in rows)
+    results.sort(key=lambda r: -r['rank'])
+    return results[:wanted]
+
+
+def _search_index(tenant_id, querysets, terms, wanted, batch_size=500):
+    """
+    Uses the per-process inverted index: candidates come back ranked from
+    memory and are then checked against the scoped querysets a batch at a
+    time until enough visible ones are found.
+    """
+    scores = index.search_tenant(tenant_id, terms, lambda idx: build_tenant_index(idx, tenant_id))
+    candidates = sorted(
+        (key for key in scores if key[0] in querysets),
+        key=lambda key: (-scores[key], key),
+    )
+    results = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        visible = {}
+        for kind in querysets:
+            ids = [pk for k, pk in batch if k == kind]
+            if ids:
+                visible.update(((kind, row['id']), row) for row in querysets[kind].filter(pk__in=ids))
+        results.extend(to_result(key[0], visible[key], scores[key]) for key in batch if key in visible)
+        if len(results) >= wanted:
+            break
+    return results[:wanted]
+
+
+def build_tenant_index(idx, tenant_id):
+    sources = {
+        'task': Task._base_manager.filter(tenant_id=tenant_id),
+        'project': Project._base_manager.filter(tenant_id=tenant_id),
+        'user': User.objects.filter(tenant_id=tenant_id),
+    }
+    for kind, qs in sources.items():
+        for row in iterate_in_chunks(qs.values(*DOCUMENT_COLUMNS[kind])):
+            idx.add((kind, row['id']), document_fields(kind, row))
@@ -0,0 +1,183 @@
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+TOKEN_RE = re.compile(r'\w+')
+# Tenants whose index is kept in memory at once, least recently used evicted
+MAX_CACHED_TENANTS = 16
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """
+    token -> {document key: weight}, with prefix lookups through a sorted
+    copy of the vocabulary that is only rebuilt after tokens come or go.
+    Not thread-safe on its own; the module-level registry serialises access
+    per tenant.
+    """
+    def __init__(self):
+        self.postings = {}
+        self.documents = {}
+        self._vocabulary = None
+
+    def add(self, key, fields):
+        """
+        Indexes a document from (text, weight) pairs, replacing any earlier
+        version of it.
+        """
+        self.remove(key)
+        weights = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0), weight)
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self._vocabulary = None
+            self.postings[token][key] = weight
+        self.documents[key] = tuple(weights)
+
+    def remove(self, key):
+        for token in self.documents.pop(key, ()):
+            posting = self.postings[token]
+            posting.pop(key, None)
+            if not posting:
+                del self.postings[token]
+                self._vocabulary = None
+
+    def _expand(self, term):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            yield token
+
+    def search(self, terms):
+        """
+        {key: score} of the documents containing every term as a word
+        prefix. A term scores the weight of the field it was found in,
+        doubled for a whole-word match.
+        """
+        scores = None
+        for term in terms:
+            matched = {}
+            for token in self._expand(term):
+                bonus = 2 if token == term else 1
+                for key, weight in self.postings[token].items():
+                    matched[key] = max(matched.get(key, 0), weight * bonus)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {key: score + matched[key] for key, score in scores.items() if key in matched}
+            if not scores:
+                return {}
+        return scores or {}
+
+
+# _lock guards the registry itself; each tenant's index is built, searched
+# and patched under that tenant's own lock, so a slow rebuild only holds up
+# searches of the same tenant.
+_lock = threading.Lock()
+_indexes = OrderedDict()
+_tenant_locks = {}
+
+
+def _cache():
+    return caches[settings.SEARCH_INDEX_CACHE]
+
+
+def _tenant_lock(tenant_id):
+    with _lock:
+        return _tenant_locks.setdefault(tenant_id, threading.Lock())
+
+
+def _version_key(tenant_id):
+    return f'search:index-version:{tenant_id}'
+
+
+def index_version(tenant_id):
+    """
+    Version of a tenant's searchable data; seeded from the clock like the
+    RBAC hierarchy version so an evicted key never goes backwards.
+    """
+    cache = _cache()
+    version = cache.get(_version_key(tenant_id))
+    if version is None:
+        cache.add(_version_key(tenant_id), time.time_ns(), None)
+        version = cache.get(_version_key(tenant_id))
+    return version
+
+
+def _bump_version(tenant_id):
+    old = index_version(tenant_id)
+    cache = _cache()
+    try:
+        return old, cache.incr(_version_key(tenant_id))
+    except ValueError:
+        new = time.time_ns()
+        cache.set(_version_key(tenant_id), new, None)
+        return old, new
+
+
+def search_tenant(tenant_id, terms, build):
+    """
+    Runs terms against the tenant's index, first (re)building it with
+    build(index) if this process has none or another process changed the
+    data since.
+    """
+    version = index_version(tenant_id)
+    with _tenant_lock(tenant_id):
+        with _lock:
+            entry = _indexes.get(tenant_id)
+        if entry is None or entry[0] != version:
+            index = InvertedIndex()
+            build(index)
+            entry = (version, index)
+        with _lock:
+            _indexes[tenant_id] = entry
+            _indexes.move_to_end(tenant_id)
+            while len(_indexes) > MAX_CACHED_TENANTS:
+                _indexes.popitem(last=False)
+        return entry[1].search(terms)
+
+
+def record_change(tenant_id, key, fields=None):
+    """
+    Updates one document after a write (fields=None removes it). Other
+    processes see the version bump and rebuild on their next search; this one
+    patches its index in place when it was up to date.
+    """
+    old, new = _bump_version(tenant_id)
+    with _tenant_lock(tenant_id):
+        with _lock:
+            entry = _indexes.get(tenant_id)
+            if entry is None:
+                return
+            if entry[0] != old:
+                del _indexes[tenant_id]
+                return
+        index = entry[1]
+        if fields is None:
+            index.remove(key)
+        else:
+            index.add(key, fields)
+        with _lock:
+            # Unless another tenant's search evicted it in the meantime
+            if _indexes.get(tenant_id) is entry:
+                _indexes[tenant_id] = (new, index)
+
+
+def invalidate(tenant_id):
+    """
+    Forces a rebuild of the tenant's index on the next search.
+    """
+    _bump_version(tenant_id)
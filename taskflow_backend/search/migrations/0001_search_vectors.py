@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# PostgreSQL only: a generated (so always current, including after
+# bulk_create/update) tsvector column plus a GIN index per searchable table.
+# Title-like fields get weight A, the rest B. The 'simple' configuration
+# keeps names and mixed-language text unstemmed; emails are split into
+# words so any part of them can be searched. search.engine queries these
+# columns with raw SQL since they are not model fields. Other backends use
+# the in-process index in search.index instead.
+# Adding a stored generated column rewrites the whole table under an ACCESS
+# EXCLUSIVE lock, blocking reads and writes of tasks and users until it is
+# done: on a large database, apply this migration in a maintenance window.
+VECTORS = {
+    'tasks_task': (
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ),
+    'projects_project': (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ),
+    'accounts_user': (
+        "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+        "setweight(to_tsvector('simple', regexp_replace(coalesce(email, ''), '\\W+', ' ', 'g')), 'B')"
+    ),
+}
+
+
+def add_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, expression in VECTORS.items():
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+            f'GENERATED ALWAYS AS ({expression}) STORED'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in VECTORS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_idx')
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_reports_to_role_index'),
+        ('projects', '0001_initial'),
+        ('tasks', '0003_task_search_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, drop_search_vectors),
+    ]
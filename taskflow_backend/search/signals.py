@@ -0,0 +1,44 @@
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import User
+from projects.models import Project
+from tasks.models import Task
+from tasks.signals import tasks_bulk_saved
+from . import index
+from .engine import DOCUMENT_COLUMNS, document_fields
+
+# Keeps the in-process fallback index current. On PostgreSQL the generated
+# search_vector columns maintain themselves and these handlers do nothing.
+KIND_BY_MODEL = {Task: 'task', Project: 'project', User: 'user'}
+
+
+def _index_instance(kind, instance):
+    if connection.vendor == 'postgresql' or instance.tenant_id is None:
+        return
+    if any(column not in instance.__dict__ for column in DOCUMENT_COLUMNS[kind]):
+        # Deferred fields would cost a query each; let the index rebuild instead
+        index.invalidate(instance.tenant_id)
+        return
+    index.record_change(instance.tenant_id, (kind, instance.pk), document_fields(kind, instance))
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=User)
+def search_post_save_handler(sender, instance, **kwargs):
+    _index_instance(KIND_BY_MODEL[sender], instance)
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=User)
+def search_post_delete_handler(sender, instance, **kwargs):
+    if connection.vendor == 'postgresql' or instance.tenant_id is None:
+        return
+    index.record_change(instance.tenant_id, (KIND_BY_MODEL[sender], instance.pk))
+
+@receiver(tasks_bulk_saved, sender=Task)
+def search_bulk_saved_handler(sender, created, updated, **kwargs):
+    if connection.vendor == 'postgresql':
+        return
+    for tenant_id in {task.tenant_id for task in [*created, *updated]}:
+        index.invalidate(tenant_id)
@@ -0,0 +1,47 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from .engine import KINDS, search
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+# Deepest result reachable by paging; ranking beyond it is not worth the scan
+MAX_OFFSET = 1000
+
+
+class SearchView(APIView):
+    """
+    GET: Ranked search across tasks, projects and users the current user can see.
+    ?q=<text> (required), ?type=task,project,user to narrow it down,
+    ?page= / ?page_size= for paging; `next` links to the following page.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = [k.strip() for k in request.query_params.get('type', ','.join(KINDS)).split(',') if k.strip()]
+        invalid = [k for k in kinds if k not in KINDS]
+        if invalid or not kinds:
+            return Response({"error": f"type must be a comma-separated list of: {', '.join(KINDS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "page and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        offset = (page - 1) * page_size
+        if page < 1 or offset > MAX_OFFSET:
+            return Response({"error": f"page must be between 1 and {MAX_OFFSET // page_size + 1}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        effective_user = getattr(request, 'effective_user', request.user)
+        results, has_more = search(effective_user, text, kinds, offset, page_size)
+
+        next_url = None
+        if has_more and offset + page_size <= MAX_OFFSET:
+            next_url = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return Response({'results': results, 'next': next_url})
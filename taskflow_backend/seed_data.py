@@ -25,8 +25,8 @@ def run_seed():
 
     print("Creating Tenant...")
     tenant = Tenant.objects.create(name="ShreeTech Solutions Pvt Ltd", plan="premium")
-    from accounts.middleware import _thread_locals
-    _thread_locals.tenant = tenant
+    from accounts.middleware import set_current_tenant
+    set_current_tenant(tenant)
 
     print("Creating Super Admin...")
     super_admin = User.objects.create_user(
@@ -0,0 +1,89 @@
+import functools
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from accounts.scope import hierarchy_version
+
+
+def _cache():
+    return caches[settings.CONDITIONAL_GET_CACHE]
+
+
+def _version_key(tenant_id, model):
+    return f'etag:version:{model._meta.label_lower}:{tenant_id}'
+
+
+def change_versions(tenant_id, models):
+    """
+    Change version of each model within the tenant, read in one cache round
+    trip. Missing versions (first use, eviction, expiry) are seeded from the
+    clock, so they never go back to a value an ETag was already built from.
+    """
+    cache = _cache()
+    keys = [_version_key(tenant_id, model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), settings.CONDITIONAL_GET_VERSION_TTL)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_change_version(tenant_id, model):
+    """
+    Changes the ETags of every conditional view over model in the tenant once
+    the current transaction commits, so no reader can pair the new version
+    with pre-commit data.
+    """
+    if tenant_id is None:
+        return
+
+    def bump():
+        cache = _cache()
+        key = _version_key(tenant_id, model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), settings.CONDITIONAL_GET_VERSION_TTL)
+
+    transaction.on_commit(bump)
+
+
+def conditional_get(*models):
+    """
+    Decorates an API view's get() with an ETag built from the tenant's
+    change versions of `models` (bumped by their save and delete signals),
+    the viewer, the RBAC hierarchy version and today's date (overdue counts
+    roll over at midnight). A matching If-None-Match gets a 304 without a
+    single query of the view's own. No Last-Modified is sent: versions are
+    counters, not times.
+    Profile-only edits of users (names, avatars) do not change the ETag.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            def etag(request, *args, **kwargs):
+                effective_user = getattr(request, 'effective_user', request.user)
+                tenant_id = effective_user.tenant_id
+                fingerprint = repr((
+                    request.get_full_path(), request.user.pk, effective_user.pk, effective_user.role,
+                    hierarchy_version(tenant_id), timezone.localdate().isoformat(),
+                    change_versions(tenant_id, models),
+                ))
+                return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+            response = condition(etag_func=etag)(
+                lambda request, *a, **kw: method(view, request, *a, **kw)
+            )(request, *args, **kwargs)
+
+            # Per-user data: browsers may keep it but must revalidate every time
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization', 'X-View-As-User'))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,105 @@
+import json
+import operator
+from functools import reduce
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def _reversed(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    CursorPagination that keys the cursor on every ordering field, not just
+    the first one. DRF places a cursor by ordering[0] plus an offset among
+    equal values, and caps that offset at offset_cutoff, so paging through
+    a non-unique sort such as (priority_rank, id) repeats pages once a tie
+    is longer than that. Here the position is the whole (unique) ordering
+    tuple and each page is a lexicographic "after this row" filter, so a
+    page costs the same however deep it is and never needs an offset.
+    The ordering must end in a unique field.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        queryset = queryset.order_by(*(_reversed(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = self._get_position_from_instance(results[-1], self.ordering) if len(results) > self.page_size else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, position, reverse):
+        """
+        Rows strictly after `position` in the (possibly reversed) ordering:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        branches, equal = [], Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            branches.append(equal & Q(**{f'{name}__{lookup}': value}))
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, branches)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in names]
+        else:
+            values = [getattr(instance, name) for name in names]
+        return json.dumps([str(value) for value in values])
+
+
+class CreatedAtCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first, with an opaque cursor.
+    Opt-in: list endpoints keep returning a plain array unless the client asks
+    for a page with ?page_size=N. The next/previous links carry page_size and
+    any other query params (e.g. ?role=, ?project_id=) along with the cursor.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class BoardColumnCursorPagination(CreatedAtCursorPagination):
+    """
+    One Kanban column page: always paginated (20 cards unless ?page_size=),
+    ordered by whatever the view's ordering filter asks for.
+    """
+    page_size = 20
+    max_page_size = 100
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'analytics',
     'performance',
     'ai',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -46,7 +47,6 @@ MIDDLEWARE = [
     
     # Custom Tenant & Impersonation Middleware
     'accounts.middleware.TenantMiddleware',
-    'accounts.middleware.ImpersonationMiddleware',
 ]
 
 ROOT_URLCONF = 'taskflow_backend.urls'
@@ -114,6 +114,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'taskflow_backend.pagination.CreatedAtCursorPagination',
 }
 
 SIMPLE_JWT = {
@@ -180,6 +181,85 @@ CORS_ALLOW_HEADERS = [
     "x-impersonate-user",
 ]
 
+# Caching: per-process memory by default. Point 'default' at a shared backend
+# (Redis, Memcached, database) when running several workers so invalidations
+# reach every process instead of waiting out the TTLs.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'taskflow'),
+    }
+}
+
+# RBAC visibility scope cache (accounts.scope)
+RBAC_SCOPE_CACHE = 'default'
+RBAC_SCOPE_TTL = int(os.environ.get('RBAC_SCOPE_TTL', 300))
+RBAC_SCOPE_INLINE_LIMIT = int(os.environ.get('RBAC_SCOPE_INLINE_LIMIT', 200))
+
+# Analytics/performance response cache (analytics.cache). Entries are dropped on
+# writes through a per-tenant version; the TTL only bounds missed invalidations.
+ANALYTICS_CACHE = 'default'
+ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 60))
+ANALYTICS_CACHE_STALE_TTL = int(os.environ.get('ANALYTICS_CACHE_STALE_TTL', 300))
+# Alias of a shared cache (not locmem) that counts analytics cache hits and
+# misses across workers for `manage.py analytics_cache_stats`; unset turns
+# the counters off.
+ANALYTICS_STATS_CACHE = os.environ.get('ANALYTICS_STATS_CACHE') or None
+
+# ETags of conditional GETs (taskflow_backend.conditional) are built from
+# per-tenant change versions kept in this cache. The TTL bounds how long a
+# missed bump (e.g. a write seen only by another worker's per-process cache)
+# can keep answering 304; each expiry costs clients one full response.
+CONDITIONAL_GET_CACHE = 'default'
+CONDITIONAL_GET_VERSION_TTL = int(os.environ.get('CONDITIONAL_GET_VERSION_TTL', 60))
+
+# Per-tenant data versions of the in-process search index (search.index), used
+# when the database has no full-text search; processes rebuild on a new version.
+SEARCH_INDEX_CACHE = 'default'
+
+# Notification fan-out (notifications.outbox): 'thread' writes from a background
+# thread in batches, 'sync' writes right after the triggering transaction commits.
+NOTIFICATION_DISPATCH = os.environ.get('NOTIFICATION_DISPATCH', 'thread')
+# Repeated task_updated notifications of a (user, task) within this many seconds
+# update the unread row in place instead of adding one; 0 turns it off.
+NOTIFICATION_DEDUP_WINDOW = int(os.environ.get('NOTIFICATION_DEDUP_WINDOW', 300))
+
+# Live notification streams (notifications.stream): 'memory' only wakes streams
+# in the writing process, 'postgres' fans out to every process via LISTEN/NOTIFY.
+# Streams are long-lived: serve them from ASGI workers (e.g. gunicorn -k
+# uvicorn.workers.UvicornWorker taskflow_backend.asgi), where an open stream
+# costs no worker thread; under WSGI each one holds a thread until MAX_AGE.
+NOTIFICATION_STREAM_BACKEND = os.environ.get('NOTIFICATION_STREAM_BACKEND', 'memory')
+NOTIFICATION_STREAM_HEARTBEAT = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT', 15))
+NOTIFICATION_STREAM_MAX_AGE = int(os.environ.get('NOTIFICATION_STREAM_MAX_AGE', 300))
+# Lifetime of the ?token= that EventSource clients (which cannot send an
+# Authorization header) get from POST /api/v1/notifications/stream/token/.
+NOTIFICATION_STREAM_TOKEN_TTL = int(os.environ.get('NOTIFICATION_STREAM_TOKEN_TTL', 60))
+# LISTEN needs a session of its own, which the transaction-mode pooler behind
+# DB_HOST cannot hold: NOTIFICATION_STREAM_LISTEN_HOST/PORT point the listener
+# straight at the database. Without them, the 'postgres' backend only wakes
+# streams in the writing process and the others pick new rows up at their
+# next heartbeat.
+_LISTEN_HOST = os.environ.get('NOTIFICATION_STREAM_LISTEN_HOST')
+if _DB_HOST and _LISTEN_HOST:
+    DATABASES['notifications_listen'] = {
+        **DATABASES['default'],
+        'HOST': _LISTEN_HOST,
+        'PORT': os.environ.get('NOTIFICATION_STREAM_LISTEN_PORT', '5432'),
+        'CONN_MAX_AGE': 0,
+    }
+NOTIFICATION_STREAM_LISTEN_DATABASE = 'notifications_listen' if 'notifications_listen' in DATABASES else None
+
+# Notification retention (notifications.retention): read notifications older than
+# a tenant's notification_retention_days (else NOTIFICATION_RETENTION_DAYS) are
+# deleted, after being archived to NOTIFICATION_ARCHIVE_DIR when it is set.
+# The in-process scheduler runs every NOTIFICATION_RETENTION_INTERVAL seconds; 0 turns it off.
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_RETENTION_INTERVAL = int(os.environ.get('NOTIFICATION_RETENTION_INTERVAL', 6 * 60 * 60))
+NOTIFICATION_RETENTION_BATCH = int(os.environ.get('NOTIFICATION_RETENTION_BATCH', 1000))
+NOTIFICATION_RETENTION_PAUSE = float(os.environ.get('NOTIFICATION_RETENTION_PAUSE', 0.05))
+NOTIFICATION_ARCHIVE_DIR = os.environ.get('NOTIFICATION_ARCHIVE_DIR') or None
+
 # Email Configuration (Console for local dev)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -10,4 +10,5 @@ urlpatterns = [
     path('api/v1/analytics/', include('analytics.urls')),
     path('api/v1/performance/', include('performance.urls')),
     path('api/v1/ai/', include('ai.urls')),
+    path('api/v1/search/', include('search.urls')),
 ]
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from django.db.models import Count, Q
+
+OPEN_STATUSES = ['todo', 'in_progress']
+
+
+def status_counts(today):
+    """
+    Conditional Count() expressions for the status and overdue buckets.
+    Spread them into a single .aggregate()/.annotate() call so every bucket
+    comes out of one scan over the task set.
+    """
+    return {
+        'total': Count('id'),
+        'todo': Count('id', filter=Q(status='todo')),
+        'in_progress': Count('id', filter=Q(status='in_progress')),
+        'done': Count('id', filter=Q(status='done')),
+        'overdue': Count('id', filter=Q(status__in=OPEN_STATUSES, due_date__lt=today)),
+    }
+
+
+def daily_counts(field, start, end, extra=None):
+    """
+    One conditional Count() per calendar day in [start, end] on the date
+    column `field`, keyed 'day_<offset>'. Use day_buckets() to read them back.
+    """
+    extra = extra or Q()
+    return {
+        f'day_{offset}': Count('id', filter=extra & Q(**{field: start + timedelta(days=offset)}))
+        for offset in range((end - start).days + 1)
+    }
+
+
+def day_buckets(row, start, end):
+    """
+    Pairs each day in [start, end] with its count from a daily_counts() result.
+    """
+    return [
+        (start + timedelta(days=offset), row[f'day_{offset}'])
+        for offset in range((end - start).days + 1)
+    ]
@@ -0,0 +1,213 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from projects.models import Project
+from .models import Task
+from .serializers import TaskBulkItemSerializer, assignment_error
+from .signals import tasks_bulk_saved
+
+User = get_user_model()
+
+MAX_BULK_ITEMS = 500
+TASK_FIELDS = ['project', 'title', 'description', 'priority', 'status', 'assigned_to', 'due_date']
+MOVE_FIELDS = ['project', 'status']
+
+
+class ItemError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors if isinstance(errors, dict) else {'non_field_errors': [errors]}
+
+
+class TaskBulkOperation:
+    """
+    Applies many task creates, updates, moves and deletes in one go.
+    Everything the batch refers to (assignees, projects, tasks) is loaded
+    with one query each and checked in memory; writes then go through
+    bulk_create / bulk_update / a single DELETE in one transaction, and
+    tasks_bulk_saved lets notifications and rollups catch up.
+
+    Payload: {"atomic": bool, "create": [...], "update": [...],
+              "move": [{"id", "status", "project"}], "delete": [id, ...]}
+    Invalid items are reported per item; with atomic=true any error
+    cancels the whole batch. notify=False skips the notifications.
+    """
+    def __init__(self, request_user, effective_user, payload, notify=True):
+        self.request_user = request_user
+        self.effective_user = effective_user
+        self.payload = payload
+        self.notify = notify
+        self.errors = []
+
+    def run(self):
+        items = self._parse()
+        atomic = self.atomic
+        self._preload(items)
+
+        to_create, to_update, to_delete = [], {}, set()
+        # Deletes first, so updates and moves of a task deleted in the same batch fail
+        for op, index, data in sorted(items, key=lambda item: item[0] != 'delete'):
+            try:
+                if op == 'create':
+                    to_create.append(self._build_create(data))
+                elif op == 'delete':
+                    to_delete.add(self._check_delete(data))
+                else:
+                    task = self._apply_update(data, MOVE_FIELDS if op == 'move' else TASK_FIELDS, to_delete)
+                    to_update[task.pk] = task
+            except ItemError as e:
+                self.errors.append({'op': op, 'index': index, 'errors': e.errors})
+
+        if self.errors and atomic:
+            return {'created': [], 'updated': [], 'deleted': [], 'errors': self.errors}
+
+        updated = list(to_update.values())
+        # Items that leave a task as it was succeed without a write or any signal work
+        changed = [task for task in updated if task.changed_fields()]
+        with transaction.atomic():
+            created = Task.objects.bulk_create(to_create)
+            if changed:
+                # bulk_update skips auto_now, so stamp updated_at ourselves
+                now = timezone.now()
+                for task in changed:
+                    task.updated_at = now
+                Task.objects.bulk_update(changed, sorted(self.updated_fields | {'updated_at'}))
+            if to_delete:
+                Task.objects.filter(pk__in=to_delete).delete()
+            tasks_bulk_saved.send(sender=Task, created=created, updated=changed, notify=self.notify)
+
+        return {
+            'created': [task.pk for task in created],
+            'updated': [task.pk for task in updated],
+            'deleted': sorted(to_delete),
+            'errors': self.errors,
+        }
+
+    def _parse(self):
+        if not isinstance(self.payload, dict):
+            raise serializers.ValidationError("Expected an object with create/update/move/delete lists.")
+        try:
+            # Same parsing as a BooleanField, so "false" and 0 mean false
+            self.atomic = serializers.BooleanField().to_internal_value(self.payload.get('atomic', False))
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({'atomic': e.detail})
+
+        items = []
+        for op in ('create', 'update', 'move', 'delete'):
+            entries = self.payload.get(op, [])
+            if not isinstance(entries, list):
+                raise serializers.ValidationError({op: "Expected a list."})
+            items.extend((op, index, entry) for index, entry in enumerate(entries))
+
+        if not items:
+            raise serializers.ValidationError("Nothing to do.")
+        if len(items) > MAX_BULK_ITEMS:
+            raise serializers.ValidationError(f"A bulk request can contain at most {MAX_BULK_ITEMS} items.")
+
+        parsed = []
+        for op, index, entry in items:
+            if op == 'delete':
+                data = entry.get('id') if isinstance(entry, dict) else entry
+                if not isinstance(data, int) or isinstance(data, bool):
+                    self.errors.append({'op': op, 'index': index, 'errors': {'id': ["A valid integer is required."]}})
+                    continue
+            else:
+                serializer = TaskBulkItemSerializer(data=entry)
+                if not serializer.is_valid():
+                    self.errors.append({'op': op, 'index': index, 'errors': serializer.errors})
+                    continue
+                data = serializer.validated_data
+            parsed.append((op, index, data))
+        return parsed
+
+    def _preload(self, items):
+        assignee_ids, project_ids, task_ids = set(), set(), set()
+        for op, index, data in items:
+            if op == 'delete':
+                task_ids.add(data)
+                continue
+            if data.get('assigned_to'):
+                assignee_ids.add(data['assigned_to'])
+            if 'project' in data:
+                project_ids.add(data['project'])
+            if 'id' in data:
+                task_ids.add(data['id'])
+
+        # One snapshot of everything the permission checks need
+        self.assignees = User.objects.only('id', 'tenant_id', 'reports_to_id', 'role').in_bulk(assignee_ids)
+        self.project_ids = set(
+            Project.objects.filter(tenant=self.request_user.tenant_id, pk__in=project_ids).values_list('pk', flat=True)
+        )
+        self.tasks = Task.objects.visible_to(self.effective_user).in_bulk(task_ids)
+        self.updated_fields = set()
+
+    def _check_project(self, project_id):
+        if project_id not in self.project_ids:
+            raise ItemError({'project': ["Project not found."]})
+        return project_id
+
+    def _check_assignee(self, assignee_id):
+        if assignee_id is None:
+            return None
+        assignee = self.assignees.get(assignee_id)
+        if assignee is None:
+            raise ItemError({'assigned_to': ["User not found."]})
+        error = assignment_error(self.request_user, assignee)
+        if error:
+            raise ItemError({'assigned_to': [error]})
+        return assignee_id
+
+    def _build_create(self, data):
+        missing = {f: ["This field is required."] for f in ('project', 'title') if f not in data}
+        if missing:
+            raise ItemError(missing)
+
+        assigned_to_id = self._check_assignee(data.get('assigned_to'))
+        if 'assigned_to' not in data and self.request_user.role == 'employee':
+            assigned_to_id = self.request_user.pk
+
+        return Task(
+            tenant_id=self.request_user.tenant_id,
+            project_id=self._check_project(data['project']),
+            title=data['title'],
+            description=data.get('description'),
+            priority=data.get('priority', 'medium'),
+            status=data.get('status', 'todo'),
+            assigned_to_id=assigned_to_id,
+            assigned_by_id=self.request_user.pk,
+            due_date=data.get('due_date'),
+        )
+
+    def _apply_update(self, data, allowed, deleting):
+        if 'id' not in data:
+            raise ItemError({'id': ["This field is required."]})
+        task = self.tasks.get(data['id'])
+        if task is None or data['id'] in deleting:
+            raise ItemError({'id': ["Task not found."]})
+
+        extra = set(data) - set(allowed) - {'id'}
+        if extra:
+            raise ItemError({f: ["This field cannot be changed here."] for f in extra})
+
+        # Check the whole item before touching the task: it is shared with
+        # later items, which would save a half-applied failed one
+        if 'project' in data:
+            project_id = self._check_project(data['project'])
+        if 'assigned_to' in data:
+            assigned_to_id = self._check_assignee(data['assigned_to'])
+
+        if 'project' in data:
+            task.project_id = project_id
+        if 'assigned_to' in data:
+            task.assigned_to_id = assigned_to_id
+        for field in ('title', 'description', 'priority', 'status', 'due_date'):
+            if field in data:
+                setattr(task, field, data[field])
+        self.updated_fields.update(f for f in data if f != 'id')
+        return task
+
+    def _check_delete(self, task_id):
+        if task_id not in self.tasks:
+            raise ItemError({'id': ["Task not found."]})
+        return task_id
@@ -0,0 +1,144 @@
+from datetime import date
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from .aggregates import OPEN_STATUSES
+from .models import Task
+
+
+def _rank(field, values):
+    return Case(
+        *[When(**{field: value}, then=Value(rank)) for rank, value in enumerate(values)],
+        default=Value(len(values)),
+        output_field=IntegerField(),
+    )
+
+
+def _choice_list(params, name, choices):
+    raw = params.get(name)
+    if not raw:
+        return None
+    values = [v.strip() for v in raw.split(',') if v.strip()]
+    allowed = [key for key, _ in choices]
+    invalid = [v for v in values if v not in allowed]
+    if invalid:
+        raise ValidationError({"error": f"Invalid {name}: {', '.join(invalid)}. Use one of: {', '.join(allowed)}."})
+    return values
+
+
+def _id_list(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        return [int(v) for v in raw.split(',') if v.strip()]
+    except ValueError:
+        raise ValidationError({"error": f"{name} must be a comma-separated list of ids."})
+
+
+def _date(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValidationError({"error": f"{name} must be a date (YYYY-MM-DD)."})
+
+
+class TaskFilter(BaseFilterBackend):
+    """
+    Query-parameter filters for task lists, each a plain indexed predicate:
+    ?project=1,2  ?status=todo,in_progress  ?priority=high
+    ?assigned_to=5,7 | me | none  ?due_after=2024-01-01  ?due_before=2024-01-31
+    ?overdue=true  ?search=text (title or description)
+    Search is an icontains, i.e. UPPER(col) LIKE UPPER('%text%'); on Postgres
+    the trigram indexes from tasks/0003 serve it, elsewhere it scans.
+    """
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        effective_user = getattr(request, 'effective_user', request.user)
+
+        projects = _id_list(params, 'project')
+        if projects is not None:
+            queryset = queryset.filter(project_id__in=projects)
+
+        statuses = _choice_list(params, 'status', Task.STATUS_CHOICES)
+        if statuses is not None:
+            queryset = queryset.filter(status__in=statuses)
+
+        priorities = _choice_list(params, 'priority', Task.PRIORITY_CHOICES)
+        if priorities is not None:
+            queryset = queryset.filter(priority__in=priorities)
+
+        assigned_to = params.get('assigned_to')
+        if assigned_to == 'me':
+            queryset = queryset.filter(assigned_to=effective_user.pk)
+        elif assigned_to == 'none':
+            queryset = queryset.filter(assigned_to__isnull=True)
+        elif assigned_to:
+            queryset = queryset.filter(assigned_to__in=_id_list(params, 'assigned_to'))
+
+        due_after = _date(params, 'due_after')
+        if due_after is not None:
+            queryset = queryset.filter(due_date__gte=due_after)
+        due_before = _date(params, 'due_before')
+        if due_before is not None:
+            queryset = queryset.filter(due_date__lte=due_before)
+
+        if params.get('overdue', '').lower() in ('true', '1'):
+            queryset = queryset.filter(status__in=OPEN_STATUSES, due_date__lt=timezone.now().date())
+
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(Q(title__icontains=search) | Q(description__icontains=search))
+
+        return queryset
+
+
+class TaskOrderingFilter(BaseFilterBackend):
+    """
+    ?ordering=<field> or -<field> over a whitelist; id breaks ties.
+    Priority and status sort by their natural order rather than
+    alphabetically, and tasks without a due date sort last. Every sort key
+    is a non-null column or annotation so CreatedAtCursorPagination (which
+    asks get_ordering() for the order) can page through it.
+    """
+    ordering_param = 'ordering'
+    default_ordering = ('-created_at', '-id')
+    # public name -> (sort key, annotation or None)
+    ordering_fields = {
+        'created_at': ('created_at', None),
+        'title': ('title', None),
+        'due_date': ('due_sort', Coalesce('due_date', Value(date.max))),
+        'priority': ('priority_rank', _rank('priority', ['low', 'medium', 'high'])),
+        'status': ('status_rank', _rank('status', ['todo', 'in_progress', 'done'])),
+    }
+
+    def _requested(self, request):
+        raw = request.query_params.get(self.ordering_param, '').strip()
+        if not raw:
+            return None
+        descending = raw.startswith('-')
+        name = raw.lstrip('-')
+        if name not in self.ordering_fields:
+            raise ValidationError({"error": f"Cannot order by {name}. Use one of: {', '.join(self.ordering_fields)}."})
+        return name, descending
+
+    def get_ordering(self, request, queryset, view):
+        requested = self._requested(request)
+        if requested is None:
+            return self.default_ordering
+        name, descending = requested
+        prefix = '-' if descending else ''
+        return (prefix + self.ordering_fields[name][0], prefix + 'id')
+
+    def filter_queryset(self, request, queryset, view):
+        requested = self._requested(request)
+        if requested is not None:
+            key, annotation = self.ordering_fields[requested[0]]
+            if annotation is not None:
+                queryset = queryset.annotate(**{key: annotation})
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+from itertools import islice
+from django.contrib.auth import get_user_model
+from projects.models import Project
+from .bulk import MAX_BULK_ITEMS, TaskBulkOperation
+
+User = get_user_model()
+
+IMPORT_FORMATS = ('csv', 'ndjson', 'json')
+# Same column names as the task export, so an export can be fed straight back
+IMPORT_COLUMNS = (
+    'title', 'description', 'status', 'priority', 'due_date',
+    'project_id', 'project_name', 'assigned_to_email',
+)
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def import_format(filename, default='csv'):
+    """
+    Guesses the input format from a file name's extension.
+    """
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.json'):
+        return 'json'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_rows(stream, input_format):
+    """
+    Yields one dict per task from a binary stream without reading it all
+    first (except for 'json', which is a single array and has to be parsed
+    whole; prefer ndjson for big files).
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from _parse_rows(text, input_format)
+    except UnicodeDecodeError:
+        raise ImportFormatError("The file is not UTF-8 encoded text.")
+
+
+def _parse_rows(text, input_format):
+    if input_format == 'csv':
+        yield from csv.DictReader(text)
+    elif input_format == 'ndjson':
+        for line_number, line in enumerate(text, start=1):
+            if line.strip():
+                yield _json_object(line, f"line {line_number}")
+    elif input_format == 'json':
+        rows = _json_value(text.read(), "input")
+        if not isinstance(rows, list):
+            raise ImportFormatError("Expected a JSON array of task objects.")
+        for index, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                raise ImportFormatError(f"Item {index}: expected an object.")
+            yield row
+    else:
+        raise ImportFormatError(f"Unknown format {input_format!r}; use one of: {', '.join(IMPORT_FORMATS)}.")
+
+
+def _json_value(raw, where):
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise ImportFormatError(f"{where}: invalid JSON ({e}).")
+
+
+def _json_object(raw, where):
+    value = _json_value(raw, where)
+    if not isinstance(value, dict):
+        raise ImportFormatError(f"{where}: expected an object.")
+    return value
+
+
+class TaskImporter:
+    """
+    Creates tasks from an iterable of row dicts, chunk_size rows at a time.
+    Each chunk resolves its assignee emails and project names with one query
+    each and is then written by TaskBulkOperation, so the hierarchy rules,
+    bulk_create and rollup/notification handling match the bulk API.
+    Chunks commit independently; failed rows are reported by their 1-based
+    row number and skipped. notify=False imports without notifications.
+    """
+    def __init__(self, request_user, effective_user=None, notify=True, chunk_size=MAX_BULK_ITEMS):
+        self.request_user = request_user
+        self.effective_user = effective_user or request_user
+        self.notify = notify
+        self.chunk_size = max(1, min(chunk_size, MAX_BULK_ITEMS))
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        numbered = enumerate(rows, start=1)
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            self.rows += len(chunk)
+            self._import_chunk(chunk)
+        self.errors.sort(key=lambda error: error['row'])
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def _error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def _import_chunk(self, chunk):
+        rows = []
+        for number, row in chunk:
+            # JSON bodies reach us unchecked, so any value can turn up here
+            if not isinstance(row, dict):
+                self._error(number, {'non_field_errors': ["Expected an object with task columns."]})
+                continue
+            cleaned, errors = self._clean(row)
+            if errors:
+                self._error(number, errors)
+            else:
+                rows.append((number, cleaned))
+        tenant_id = self.request_user.tenant_id
+
+        emails = {row['assigned_to_email'] for _, row in rows if 'assigned_to_email' in row}
+        names = {row['project_name'] for _, row in rows if 'project_name' in row and 'project_id' not in row}
+        user_ids = dict(
+            User.objects.filter(tenant_id=tenant_id, email__in=emails).values_list('email', 'id')
+        ) if emails else {}
+        project_ids = {}
+        for name, pk in Project.objects.filter(tenant_id=tenant_id, name__in=names).values_list('name', 'id'):
+            project_ids.setdefault(name, []).append(pk)
+
+        items, row_numbers = [], []
+        for number, row in rows:
+            errors = {}
+            item = {f: row[f] for f in ('title', 'description', 'status', 'priority', 'due_date') if f in row}
+
+            if 'project_id' in row:
+                item['project'] = row['project_id']
+            elif 'project_name' in row:
+                matches = project_ids.get(row['project_name'], [])
+                if len(matches) == 1:
+                    item['project'] = matches[0]
+                else:
+                    errors['project_name'] = [
+                        "Project not found." if not matches else "Several projects have this name; use project_id."
+                    ]
+
+            if 'assigned_to_email' in row:
+                if row['assigned_to_email'] in user_ids:
+                    item['assigned_to'] = user_ids[row['assigned_to_email']]
+                else:
+                    errors['assigned_to_email'] = ["No user with this email in your organization."]
+
+            if errors:
+                self._error(number, errors)
+            else:
+                items.append(item)
+                row_numbers.append(number)
+
+        if not items:
+            return
+        result = TaskBulkOperation(
+            self.request_user, self.effective_user, {'create': items}, notify=self.notify
+        ).run()
+        self.created += len(result['created'])
+        for error in result['errors']:
+            self._error(row_numbers[error['index']], error['errors'])
+
+    def _clean(self, row):
+        # Blank CSV cells mean "not given"; unknown columns are ignored
+        cleaned, errors = {}, {}
+        for column in IMPORT_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, (dict, list)):
+                errors[column] = ["Expected a single value."]
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            if value not in (None, ''):
+                cleaned[column] = value
+        return cleaned, errors
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from tasks.bulk import MAX_BULK_ITEMS
+from tasks.imports import IMPORT_FORMATS, ImportFormatError, TaskImporter, import_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Imports tasks from a CSV, NDJSON or JSON file, applying the hierarchy rules of the given user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--as', dest='as_user', required=True, help="Email of the user the tasks are created by.")
+        parser.add_argument('--input', choices=IMPORT_FORMATS, help="Input format; guessed from the extension by default.")
+        parser.add_argument('--chunk-size', type=int, default=MAX_BULK_ITEMS, help="Rows written per transaction.")
+        parser.add_argument('--no-notify', action='store_true', help="Do not create assignment notifications.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['as_user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['as_user']} does not exist.")
+        if user.tenant_id is None:
+            raise CommandError(f"User {user.email} does not belong to an organization.")
+
+        importer = TaskImporter(user, notify=not options['no_notify'], chunk_size=options['chunk_size'])
+        try:
+            with open(options['path'], 'rb') as stream:
+                result = importer.run(read_rows(stream, options['input'] or import_format(options['path'])))
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFormatError as e:
+            raise CommandError(f"{e} ({importer.created} tasks from {importer.rows} rows were already imported.)")
+
+        for error in result['errors']:
+            details = '; '.join(f"{field}: {' '.join(map(str, messages))}" for field, messages in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {details}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... and {result['error_count'] - len(result['errors'])} more errors.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} of {result['rows']} rows ({result['error_count']} failed)."
+        ))
@@ -1,7 +1,31 @@
 from django.db import models
 from django.conf import settings
-from accounts.middleware import TenantAwareModel
+from accounts.middleware import TenantAwareModel, TenantAwareManager
 from projects.models import Project
+from accounts.hierarchy import visible_users_q
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, effective_user):
+        """
+        Tasks in the user's tenant assigned to someone in their RBAC scope.
+        Super admins also see unassigned tasks.
+        """
+        qs = self.filter(project__tenant=effective_user.tenant_id)
+        if effective_user.role == 'super_admin':
+            return qs
+        return qs.filter(visible_users_q(effective_user, 'assigned_to'))
+
+    def with_people(self):
+        """
+        Joins assigned_to and assigned_by in the same query, loading only the
+        user columns TaskSerializer renders, so listing N tasks stays one query.
+        """
+        task_fields = [f.name for f in self.model._meta.concrete_fields]
+        return self.select_related('assigned_to', 'assigned_by').only(
+            *task_fields,
+            'assigned_to__first_name', 'assigned_to__last_name',
+            'assigned_by__first_name', 'assigned_by__last_name',
+        )
 
 class Task(TenantAwareModel):
     PRIORITY_CHOICES = [
@@ -26,6 +50,25 @@ class Task(TenantAwareModel):
     
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantAwareManager.from_queryset(TaskQuerySet)()
+
+    class Meta:
+        indexes = [
+            # Tenant-wide status breakdowns and list scans
+            models.Index(fields=['tenant', 'status'], name='task_tenant_status_idx'),
+            # RBAC-scoped lists and dashboards: assigned_to IN (subtree) + status
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+            # Cursor pagination order within a tenant
+            models.Index(fields=['tenant', '-created_at', '-id'], name='task_tenant_created_idx'),
+            # Overdue checks only ever look at open tasks
+            models.Index(
+                fields=['tenant', 'due_date'],
+                name='task_open_due_idx',
+                condition=models.Q(status__in=['todo', 'in_progress']),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
@@ -5,6 +5,33 @@ from projects.models import Project
 
 User = get_user_model()
 
+def assignment_error(request_user, assignee):
+    """
+    Returns why request_user may not assign a task to assignee, or None.
+    Only reads ids and role off assignee, so a preloaded .only() instance
+    can be checked without further queries.
+    """
+    # 1: Tenant Validation
+    if assignee.tenant_id != request_user.tenant_id:
+        return "Cannot assign task outside your tenant."
+        
+    # 2: Hierarchy Validation
+    if request_user.role == 'super_admin':
+        pass # Super admin can assign to anyone in tenant
+    elif request_user.role == 'admin':
+        # Admin can assign to users where reports_to = admin
+        if assignee.reports_to_id != request_user.id:
+            return "Admin can only assign tasks to their managers or employees."
+    elif request_user.role == 'manager':
+        # Manager can assign to employees where reports_to = manager
+        if assignee.reports_to_id != request_user.id or assignee.role != 'employee':
+            return "Manager can only assign tasks to their employees."
+    elif request_user.role == 'employee':
+        # Employee can only assign to self
+        if assignee.pk != request_user.pk:
+            return "Employees can only assign tasks to themselves."
+    return None
+
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to_name = serializers.SerializerMethodField()
     assigned_by_name = serializers.SerializerMethodField()
@@ -14,9 +41,9 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'tenant', 'project', 'title', 'description', 
             'priority', 'status', 'assigned_to', 'assigned_to_name',
-            'assigned_by', 'assigned_by_name', 'due_date', 'created_at'
+            'assigned_by', 'assigned_by_name', 'due_date', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'tenant', 'assigned_by', 'created_at']
+        read_only_fields = ['id', 'tenant', 'assigned_by', 'created_at', 'updated_at']
 
     def get_assigned_to_name(self, obj):
         if obj.assigned_to:
@@ -32,36 +59,17 @@ class TaskSerializer(serializers.ModelSerializer):
         if not value:
             return value
             
-        request_user = self.context['request'].user
-        
-        # 1: Tenant Validation
-        if value.tenant != request_user.tenant:
-            raise serializers.ValidationError("Cannot assign task outside your tenant.")
-            
-        # 2: Hierarchy Validation
-        if request_user.role == 'super_admin':
-            pass # Super admin can assign to anyone in tenant
-        elif request_user.role == 'admin':
-            # Admin can assign to users where reports_to = admin
-            if value.reports_to != request_user:
-                raise serializers.ValidationError("Admin can only assign tasks to their managers or employees.")
-        elif request_user.role == 'manager':
-            # Manager can assign to employees where reports_to = manager
-            if value.reports_to != request_user or value.role != 'employee':
-                raise serializers.ValidationError("Manager can only assign tasks to their employees.")
-        elif request_user.role == 'employee':
-            # Employee can only assign to self
-            if value != request_user:
-                raise serializers.ValidationError("Employees can only assign tasks to themselves.")
-                
+        error = assignment_error(self.context['request'].user, value)
+        if error:
+            raise serializers.ValidationError(error)
         return value
 
     def create(self, validated_data):
-        from accounts.middleware import _thread_locals
+        from accounts.middleware import set_current_tenant
         request_user = self.context['request'].user
         
-        # Explicitly set thread-local for TenantAwareModel.save()
-        _thread_locals.tenant = request_user.tenant
+        # Explicitly set the tenant context for TenantAwareModel.save()
+        set_current_tenant(request_user.tenant)
         validated_data['tenant'] = request_user.tenant
         validated_data['assigned_by'] = request_user
         
@@ -69,3 +77,31 @@ class TaskSerializer(serializers.ModelSerializer):
              validated_data['assigned_to'] = request_user
 
         return super().create(validated_data)
+
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    Field-level validation for one item of a bulk request. Relations are
+    plain ids here; TaskBulkOperation checks them against preloaded sets
+    instead of running a lookup per item.
+    """
+    id = serializers.IntegerField(required=False)
+    project = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    priority = serializers.ChoiceField(choices=Task.PRIORITY_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    due_date = serializers.DateField(required=False, allow_null=True)
+
+class TaskCardSerializer(serializers.ModelSerializer):
+    """
+    Slim read-only task for the board. People and projects are sent once
+    alongside the cards instead of being nested in each of them.
+    """
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'project', 'title', 'priority', 'status',
+            'assigned_to', 'assigned_by', 'due_date', 'created_at'
+        ]
+        read_only_fields = fields
@@ -1,34 +1,66 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
 from .models import Task
-from notifications.models import Notification
+from notifications.outbox import outbox, task_event
+from taskflow_backend.conditional import bump_change_version
 
-@receiver(post_save, sender=Task)
-def task_post_save_handler(sender, instance, created, **kwargs):
-    if not instance.assigned_to:
-        return
+# Sent after bulk_create/bulk_update writes, which skip post_save.
+# Arguments: created (new Task list), updated (changed Task list),
+# notify (False when the caller opted out of notifications, e.g. imports).
+tasks_bulk_saved = Signal()
+
+# Changes the assignee hears about; description-only edits and bookkeeping stay quiet
+NOTIFY_FIELDS = {'title', 'priority', 'status', 'assigned_to', 'due_date', 'project'}
+
+def notification_events(task, created, changed=None):
+    """
+    The notification events a task save produces. Shared with the bulk API,
+    whose bulk_create/bulk_update calls do not send post_save.
+    changed holds the names of the fields the save changed; None means
+    unknown (a full save), which counts as a change of everything.
+    """
+    if not task.assigned_to_id:
+        return []
         
     if created:
-        Notification.objects.create(
-            user=instance.assigned_to,
-            tenant=instance.tenant,
-            type='task_assigned',
-            message=f"You have been assigned a new task: {instance.title}"
-        )
-    else:
-        if instance.status == 'done':
-            # Notify assigner that task is done
-            if instance.assigned_by and instance.assigned_by != instance.assigned_to:
-                Notification.objects.create(
-                    user=instance.assigned_by,
-                    tenant=instance.tenant,
-                    type='task_completed',
-                    message=f"Task '{instance.title}' assigned to {instance.assigned_to.email} has been completed."
-                )
-        else:
-            Notification.objects.create(
-                user=instance.assigned_to,
-                tenant=instance.tenant,
-                type='task_updated',
-                message=f"Task '{instance.title}' has been updated."
-            )
+        return [task_event('task_assigned', task.assigned_to_id, task)]
+    if changed is not None and not changed & NOTIFY_FIELDS:
+        return []
+
+    events = []
+    if changed is not None and 'assigned_to' in changed:
+        events.append(task_event('task_assigned', task.assigned_to_id, task))
+    if task.status == 'done':
+        # Notify assigner that task is done, unless the save left the status alone
+        if changed is None or 'status' in changed:
+            if task.assigned_by_id and task.assigned_by_id != task.assigned_to_id:
+                events.append(task_event('task_completed', task.assigned_by_id, task))
+    elif not events:
+        # A new assignee hears about the task anyway; others get the update
+        events.append(task_event('task_updated', task.assigned_to_id, task))
+    return events
+
+@receiver(post_save, sender=Task)
+def task_post_save_handler(sender, instance, created, update_fields=None, **kwargs):
+    # Only records events; the outbox writes the notifications off the request path.
+    # Tracked saves (TenantAwareModel) pass exactly the changed fields as update_fields.
+    for event in notification_events(instance, created, update_fields):
+        outbox.publish(event)
+
+@receiver(tasks_bulk_saved, sender=Task)
+def task_bulk_saved_handler(sender, created, updated, notify=True, **kwargs):
+    if not notify:
+        return
+    events = [event for task in created for event in notification_events(task, True)]
+    events += [event for task in updated for event in notification_events(task, False, task.changed_fields())]
+    outbox.publish_many(events)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_change_version_handler(sender, instance, **kwargs):
+    bump_change_version(instance.tenant_id, Task)
+
+@receiver(tasks_bulk_saved, sender=Task)
+def task_change_version_bulk_saved_handler(sender, created, updated, **kwargs):
+    for tenant_id in {task.tenant_id for task in [*created, *updated]}:
+        bump_change_version(tenant_id, Task)
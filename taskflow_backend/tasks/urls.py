@@ -1,8 +1,12 @@
 from django.urls import path
-from .views import TaskListCreateView, TaskDetailView, DashboardMetricsView
+from .views import TaskListCreateView, TaskDetailView, TaskBulkView, TaskBoardView, TaskImportView, TaskExportView, DashboardMetricsView
 
 urlpatterns = [
     path('dashboard/', DashboardMetricsView.as_view(), name='dashboard_metrics'),
+    path('board/', TaskBoardView.as_view(), name='task_board'),
+    path('export/', TaskExportView.as_view(), name='task_export'),
+    path('import/', TaskImportView.as_view(), name='task_import'),
+    path('bulk/', TaskBulkView.as_view(), name='task_bulk'),
     path('', TaskListCreateView.as_view(), name='task_list_create'),
     path('<int:pk>/', TaskDetailView.as_view(), name='task_detail'),
 ]
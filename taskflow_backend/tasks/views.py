@@ -1,47 +1,43 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
 from .models import Task
-from .serializers import TaskSerializer
+from .serializers import TaskSerializer, TaskCardSerializer
 from django.contrib.auth import get_user_model
 from datetime import timedelta
-from django.db.models import Count
+from django.db.models import Q, F, Count
+from rest_framework.utils.urls import replace_query_param
+from projects.models import Project
+from taskflow_backend.pagination import BoardColumnCursorPagination
+from taskflow_backend.conditional import conditional_get
 from rest_framework.exceptions import PermissionDenied
+from accounts.hierarchy import visible_users_q
+from .aggregates import status_counts, daily_counts, day_buckets
+from .bulk import TaskBulkOperation
+from .filters import TaskFilter, TaskOrderingFilter
+from .imports import TaskImporter, ImportFormatError, import_format, read_rows
+from taskflow_backend.exports import ExportView, iterate_in_chunks
 
 User = get_user_model()
 
 class TaskListCreateView(generics.ListCreateAPIView):
     """
-    GET: Returns tasks filtered by strictly governed RBAC hierarchy.
+    GET: Returns tasks filtered by strictly governed RBAC hierarchy,
+    narrowed by the query parameters of TaskFilter and sorted by ?ordering=.
     POST: Creates a task ensuring assignment constraints.
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [TaskFilter, TaskOrderingFilter]
 
-    def _get_allowed_users_for(self, effective_user):
-        if effective_user.role == 'super_admin':
-            return User.objects.filter(tenant=effective_user.tenant)
-        elif effective_user.role == 'admin':
-            subordinates = User.objects.filter(reports_to=effective_user)
-            sub_subordinates = User.objects.filter(reports_to__in=subordinates)
-            return User.objects.filter(id__in=list(subordinates.values_list('id', flat=True)) + list(sub_subordinates.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'manager':
-            employees = User.objects.filter(reports_to=effective_user)
-            return User.objects.filter(id__in=list(employees.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'employee':
-            return User.objects.filter(id=effective_user.id)
-        return User.objects.none()
+    @conditional_get(Task)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
         user = getattr(self.request, 'effective_user', self.request.user)
-        base_qs = Task.objects.filter(project__tenant=user.tenant)
-        
-        if user.role == 'super_admin':
-            return base_qs
-            
-        allowed_users = self._get_allowed_users_for(user)
-        return base_qs.filter(assigned_to__in=allowed_users)
+        return Task.objects.visible_to(user).with_people()
 
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -52,62 +48,180 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(Task)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         user = getattr(self.request, 'effective_user', self.request.user)
-        base_qs = Task.objects.filter(project__tenant=user.tenant)
-        
-        if user.role == 'super_admin':
-            return base_qs
-            
-        allowed_users = TaskListCreateView._get_allowed_users_for(self, user)
-        return base_qs.filter(assigned_to__in=allowed_users)
+        return Task.objects.visible_to(user).with_people()
+
+class TaskBulkView(APIView):
+    """
+    POST: Creates, updates, moves and deletes many tasks in one request.
+    Same RBAC rules as the single-task endpoints; see tasks.bulk for the
+    payload. Returns 400 when an atomic batch has any invalid item.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        effective_user = getattr(request, 'effective_user', request.user)
+        result = TaskBulkOperation(request.user, effective_user, request.data).run()
+
+        if result['errors'] and not (result['created'] or result['updated'] or result['deleted']):
+            return Response({"error": "No changes were applied.", "errors": result['errors']}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = Task.objects.filter(pk__in=result['created'] + result['updated']).with_people().in_bulk()
+        context = {'request': request}
+        return Response({
+            'created': TaskSerializer([tasks[pk] for pk in result['created'] if pk in tasks], many=True, context=context).data,
+            'updated': TaskSerializer([tasks[pk] for pk in result['updated'] if pk in tasks], many=True, context=context).data,
+            'deleted': result['deleted'],
+            'errors': result['errors'],
+        })
+
+class TaskImportView(APIView):
+    """
+    POST: Imports tasks from an uploaded file (multipart field "file"; CSV,
+    NDJSON or a JSON array, picked by extension or ?input=) or from a JSON
+    array body. Columns match the task export. ?notify=false skips the
+    assignment notifications, e.g. when onboarding historical data.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        effective_user = getattr(request, 'effective_user', request.user)
+        notify = request.query_params.get('notify', 'true').lower() not in ('false', '0', 'no')
+        importer = TaskImporter(request.user, effective_user, notify=notify)
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            rows = read_rows(upload.file, request.query_params.get('input') or import_format(upload.name))
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response({"error": "Upload a file or send a JSON array of tasks."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = importer.run(rows)
+        except ImportFormatError as e:
+            # Earlier chunks are already committed; say how far we got
+            return Response({"error": str(e), "rows": importer.rows, "created": importer.created}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)
+
+class TaskExportView(ExportView):
+    """
+    GET: Streams every task the user can see as CSV or NDJSON, with the same
+    scoping and TaskFilter parameters as the task list.
+    """
+    columns = (
+        'id', 'title', 'description', 'status', 'priority', 'due_date',
+        'project_id', 'project_name', 'assigned_to_email', 'assigned_by_email', 'created_at',
+    )
+    filename = 'tasks'
+
+    def get_rows(self, effective_user):
+        tasks = TaskFilter().filter_queryset(self.request, Task.objects.visible_to(effective_user), self)
+        tasks = tasks.annotate(
+            project_name=F('project__name'),
+            assigned_to_email=F('assigned_to__email'),
+            assigned_by_email=F('assigned_by__email'),
+        ).values(*self.columns)
+        return iterate_in_chunks(tasks)
+
+class TaskBoardView(generics.GenericAPIView):
+    """
+    GET: The Kanban board in one request: for every Task.STATUS_CHOICES column
+    its task count and first page of cards, plus the users and projects those
+    cards refer to, each listed once. Takes the task list's filters and
+    ?ordering=. Follow a column's `next` link (?column=<status>&cursor=...)
+    to load more of just that column.
+    Costs one count query, one per column, one for users and one for
+    projects, however many tasks there are.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [TaskFilter, TaskOrderingFilter]
+    card_fields = ('id', 'project', 'title', 'priority', 'status', 'assigned_to', 'assigned_by', 'due_date', 'created_at')
+
+    def get_queryset(self):
+        user = getattr(self.request, 'effective_user', self.request.user)
+        return Task.objects.visible_to(user).only(*self.card_fields)
+
+    @conditional_get(Task, Project)
+    def get(self, request):
+        statuses = [key for key, _ in Task.STATUS_CHOICES]
+        column = request.query_params.get('column')
+        if column is not None and column not in statuses:
+            return Response({"error": f"column must be one of: {', '.join(statuses)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = self.filter_queryset(self.get_queryset())
+        columns = [(key, label) for key, label in Task.STATUS_CHOICES if column in (None, key)]
+        counts = tasks.order_by().aggregate(**{key: Count('id', filter=Q(status=key)) for key, _ in columns})
+
+        data, cards = [], []
+        for key, label in columns:
+            paginator = BoardColumnCursorPagination()
+            page = paginator.paginate_queryset(tasks.filter(status=key), request, view=self)
+            next_link = paginator.get_next_link()
+            cards.extend(page)
+            data.append({
+                'status': key,
+                'label': label,
+                'count': counts[key],
+                'cards': TaskCardSerializer(page, many=True).data,
+                'next': replace_query_param(next_link, 'column', key) if next_link else None,
+            })
+
+        user_ids = {pk for task in cards for pk in (task.assigned_to_id, task.assigned_by_id) if pk}
+        project_ids = {task.project_id for task in cards}
+        users = User.objects.filter(pk__in=user_ids).values('id', 'first_name', 'last_name', 'email', 'avatar') if user_ids else []
+        projects = Project.objects.filter(pk__in=project_ids).values('id', 'name', 'status') if project_ids else []
+
+        return Response({
+            'columns': data,
+            'users': list(users),
+            'projects': list(projects),
+        })
 
 class DashboardMetricsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def _get_allowed_users_for(self, request_user, effective_user):
-        if effective_user.role == 'super_admin':
-            return User.objects.filter(tenant=effective_user.tenant)
-        elif effective_user.role == 'admin':
-            subordinates = User.objects.filter(reports_to=effective_user)
-            sub_subordinates = User.objects.filter(reports_to__in=subordinates)
-            return User.objects.filter(id__in=list(subordinates.values_list('id', flat=True)) + list(sub_subordinates.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'manager':
-            employees = User.objects.filter(reports_to=effective_user)
-            return User.objects.filter(id__in=list(employees.values_list('id', flat=True)) + [effective_user.id])
-        elif effective_user.role == 'employee':
-            return User.objects.filter(id=effective_user.id)
-            
-        return User.objects.none()
-
-    def get_task_queryset_for_users(self, allowed_users):
-        return Task.objects.filter(assigned_to__in=allowed_users)
+    def get_task_queryset_for(self, effective_user):
+        return Task.objects.filter(visible_users_q(effective_user, 'assigned_to'))
 
+    @conditional_get(Task)
     def get(self, request):
         effective_user = getattr(request, 'effective_user', request.user)
-        allowed_users = self._get_allowed_users_for(request.user, effective_user)
-        tasks = self.get_task_queryset_for_users(allowed_users)
+        tasks = self.get_task_queryset_for(effective_user)
         
         now = timezone.now().date()
-        
+        seven_days_ago = now - timedelta(days=7)
+
+        # Status buckets, overdue and the weekly completions in a single scan
+        counts = tasks.aggregate(
+            **status_counts(now),
+            **daily_counts('due_date', seven_days_ago, now, extra=Q(status='done')),
+        )
+
         # 1. Metrics
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='done').count()
-        pending_tasks = tasks.exclude(status='done').count()
-        overdue_tasks = tasks.filter(status__in=['todo', 'in_progress'], due_date__lt=now).count()
+        total_tasks = counts['total']
+        completed_tasks = counts['done']
+        pending_tasks = total_tasks - completed_tasks
+        overdue_tasks = counts['overdue']
 
         # 2. task distribution
         distribution = {
-            'todo': tasks.filter(status='todo').count(),
-            'in_progress': tasks.filter(status='in_progress').count(),
+            'todo': counts['todo'],
+            'in_progress': counts['in_progress'],
             'done': completed_tasks,
         }
 
-        # 3. weekly performance (Tasks completed in the last 7 days)
-        seven_days_ago = now - timedelta(days=7)
-        weekly_tasks = tasks.filter(status='done', due_date__gte=seven_days_ago, due_date__lte=now) # Assuming due_date was the metric.
-        # Group by due_date
-        weekly_performance = list(weekly_tasks.values('due_date').annotate(count=Count('id')).order_by('due_date'))
+        # 3. weekly performance (Tasks completed in the last 7 days, by due_date)
+        weekly_performance = [
+            {'due_date': day, 'count': count}
+            for day, count in day_buckets(counts, seven_days_ago, now)
+            if count
+        ]
 
         return Response({
             'metrics': {